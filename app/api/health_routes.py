@@ -1,12 +1,73 @@
-from fastapi import APIRouter
+import asyncio
 
-from app.models.schemas import HealthCheckResponse
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import text
+
+from app.core.auth import get_admin
+from app.core.database import engine
+from app.core.metrics import render_prometheus
+from app.models.schemas import HealthCheckResponse, ReadinessResponse
+from app.api.qa_routes import embedder, qdrant_registry
 
 router = APIRouter(tags=["Health Check"])
 
+READINESS_CHECK_TIMEOUT = 2.0
+
 
 @router.get("/health", response_model=HealthCheckResponse)
 async def health_check() -> HealthCheckResponse:
+    """Liveness: the process is up and serving the event loop"""
     return HealthCheckResponse(
         status="ok"
     )
+
+
+async def _check_qdrant() -> str:
+    try:
+        await asyncio.wait_for(qdrant_registry.client.get_collections(), READINESS_CHECK_TIMEOUT)
+        return "ok"
+    except Exception as e:
+        return f"error: {e}"
+
+
+async def _check_database() -> str:
+    try:
+        async def ping():
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        await asyncio.wait_for(ping(), READINESS_CHECK_TIMEOUT)
+        return "ok"
+    except Exception as e:
+        return f"error: {e}"
+
+
+def _check_model() -> str:
+    if embedder.is_loaded:
+        return "ok"
+    if embedder.load_error:
+        return f"error: {embedder.load_error}"
+    return "loading"
+
+
+@router.get("/ready", response_model=ReadinessResponse)
+async def readiness_check(response: Response) -> ReadinessResponse:
+    """Readiness: the embedding model is loaded and Qdrant (when any workspace uses it) and the database answer"""
+    components = {"model": _check_model()}
+    if qdrant_registry.uses_qdrant:
+        components["qdrant"], components["database"] = await asyncio.gather(_check_qdrant(), _check_database())
+    else:
+        components["database"] = await _check_database()
+    is_ready = all(value == "ok" for value in components.values())
+    if not is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessResponse(
+        status="ready" if is_ready else "not_ready",
+        components=components
+    )
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics(_: None = Depends(get_admin)) -> PlainTextResponse:
+    """Stage latency histograms and counters in Prometheus text format"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -1,16 +1,39 @@
-from fastapi import APIRouter, HTTPException, Depends
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Depends, Response, status
 
 from app.core.database import get_db_context
 from app.core.exceptions import DatabaseException, LLMException, EmbeddingException, VectorStoreException
-from app.core.auth import get_current_workspace
-from app.models.schemas import SaveQABody, SaneQAResponse, GetAnswerBody, GetAnswerResponse, GetAnswerResultResponse, RoleType
-from app.services.qa_service import save_qa, get_qa, get_qa_by_ticket_id
+from app.core.auth import get_admin, get_current_workspace
+from app.core.metrics import EMBED_SECONDS, RequestLabels, bind_request_labels, current_workspace, reset_request_labels
+from app.core.tracing import span
+from app.models.database import IngestionJobModel
+from app.models.schemas import SaveQABody, SaneQAResponse, SaveQABatchBody, SaveQABatchResponse, GetAnswerBody, GetAnswerResponse, GetAnswerResultResponse, GetAnswerBatchBody, GetAnswerBatchResponse, IngestionJobResponse
+from app.services.qa_service import save_qa, get_qa, get_qa_by_ticket_id, get_qa_by_question
+from app.services.job_service import create_job, get_job, get_active_job_for_ticket
+from app.services.ingestion import IngestionWorkerPool, ProgressCallback
+from app.services.backfill import BackfillRunner
 from app.services.llm_client import OpenAIClient
-from app.services.embeddings import Embedder
-from app.services.qdrant import QdrantHelper
+from app.services.llm_resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, ResilientCaller
+from app.services.dialog import build_dialog_text
+from app.services.dialog_compaction import DialogCompactor
+from app.services.embeddings import Embedder, EmbeddingBatcher
+from app.services.embedding_cache import EmbeddingCache, RedisEmbeddingBackend
+from app.services.qdrant import QdrantRegistry, VectorStore, build_point_payload
+from app.services.search_cache import SearchResultCache
+from app.services.near_duplicates import NearDuplicateDetector
+from app.services.extraction_cache import ExtractionCache
+from app.services.prefilter import DialogPrefilter
 from app.core.config import get_config
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/qa", tags=["QA Operations"])
 
 
@@ -21,85 +44,414 @@ llm_client = OpenAIClient(
     api_key=config.openai_api_key,
     model=config.openai_model,
     proxy_url=config.openai_proxy_url,
+    enable_monitoring=True,
+    extraction_mode=config.openai_extraction_mode,
+    resilience=ResilientCaller(
+        limiter=AdaptiveConcurrencyLimiter(
+            initial_limit=config.openai_initial_concurrency,
+            min_limit=config.openai_min_concurrency,
+            max_limit=config.openai_max_concurrency
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=config.openai_breaker_failure_threshold,
+            recovery_seconds=config.openai_breaker_recovery_seconds
+        ),
+        max_attempts=config.openai_max_attempts,
+        base_delay=config.openai_retry_base_delay,
+        max_delay=config.openai_retry_max_delay
+    ),
+    max_connections=config.openai_max_connections,
+    max_keepalive_connections=config.openai_max_keepalive_connections
 )
 
-embedder = Embedder()
+embedder = Embedder(
+    model_name=config.embedding_model_name,
+    max_workers=config.embedding_max_workers,
+    backend=config.embedding_backend,
+    onnx_file_name=config.embedding_onnx_file_name
+)
 
+embedding_batcher = EmbeddingBatcher(
+    embedder,
+    max_batch_size=config.embedding_batch_size,
+    max_wait_ms=config.embedding_batch_wait_ms
+)
 
-def get_qdrant_helper(workspace_id: str) -> QdrantHelper:
-    return QdrantHelper(
-        url=config.qdrant_url,
-        collection_name=config.qdrant_collection_name,
-        workspace_id=workspace_id
-    )
+embedding_cache = EmbeddingCache(
+    model_name=embedder.cache_key,
+    max_entries=config.embedding_cache_max_entries,
+    max_bytes=config.embedding_cache_max_mb * 1024 * 1024,
+    ttl_seconds=config.embedding_cache_ttl_seconds,
+    shared_backend=RedisEmbeddingBackend(
+        url=config.embedding_cache_redis_url,
+        ttl_seconds=config.embedding_cache_ttl_seconds
+    ) if config.embedding_cache_redis_url else None
+)
 
+search_cache: SearchResultCache[GetAnswerResponse] = SearchResultCache(
+    max_entries=config.search_cache_max_entries,
+    ttl_seconds=config.search_cache_ttl_seconds
+)
 
-@router.post("/save", response_model=SaneQAResponse)
-async def save_qa_handler(body: SaveQABody, workspace_id: str = Depends(get_current_workspace)) -> SaneQAResponse:
+exact_match_stats = {"hits": 0, "misses": 0}
+
+near_duplicates = NearDuplicateDetector(
+    threshold=config.near_duplicate_threshold,
+    num_perm=config.near_duplicate_num_perm,
+    bands=config.near_duplicate_bands,
+    llm_calls_per_extraction=2 if config.openai_extraction_mode == "two_step" else 1
+) if config.near_duplicate_enabled else None
+
+extraction_cache = ExtractionCache(
+    model=config.openai_model,
+    prompt_version=llm_client.prompt_version,
+    ttl_seconds=config.extraction_cache_ttl_seconds
+) if config.extraction_cache_enabled else None
+
+dialog_compactor = DialogCompactor(
+    model=config.openai_model,
+    token_budget=config.dialog_token_budget
+) if config.dialog_compaction_enabled else None
+
+prefilter = DialogPrefilter(
+    threshold=config.prefilter_threshold,
+    mode=config.prefilter_mode,
+    model_path=config.prefilter_model_path,
+    encode=embedding_batcher.encode
+) if config.prefilter_mode != "off" else None
+
+qdrant_registry = QdrantRegistry.from_config(config)
+
+
+backfill_runner = BackfillRunner(
+    llm_client=llm_client,
+    embedder=embedder,
+    qdrant_registry=qdrant_registry,
+    llm_concurrency=config.backfill_llm_concurrency,
+    upsert_batch_size=config.backfill_upsert_batch_size,
+    near_duplicates=near_duplicates,
+    extraction_cache=extraction_cache,
+    dialog_compactor=dialog_compactor,
+    prefilter=prefilter
+)
+
+
+async def warm_up():
+    """Load heavy components in the background after the server has started accepting connections"""
     try:
+        await embedder.aload()
+    except Exception as e:
+        logger.error("Embedding model failed to load: %s", e)
+
+    if dialog_compactor is not None:
+        await asyncio.to_thread(dialog_compactor.load)
+
+    for workspace_id in config.workspace_tokens:
         try:
-            with get_db_context() as db:
-                existing = get_qa_by_ticket_id(db, workspace_id, body.ticket_id)
-                if existing:
-                    return SaneQAResponse(
-                        status="success",
-                        message="Ticket already saved",
-                        extracted_question=existing.question,
-                        extracted_answer=existing.answer,
-                        ticket_id=int(existing.ticket_id),
-                        already_saved=True
-                    )
+            await qdrant_registry.get(workspace_id)
         except Exception as e:
-            raise DatabaseException(f"Error checking existing ticket: {str(e)}")
+            logger.warning("Could not prepare vector store for %s: %s", workspace_id, e)
 
-        full_dialog_text = "\n".join([
-            (("USER" if msg.role == RoleType.USER else "SUPPORT") + ": " + msg.content)
-            for msg in body.dialog
-        ])
 
-        qa_result = llm_client.extract_qa_pair_with_validation(full_dialog_text)
-            
-        if not qa_result:
-            return SaneQAResponse(
-                status="error",
-                message="No high-quality Q&A pair found in dialog. Dialog may not contain business-relevant questions or clear answers."
-            )
-        
-        extracted_question = qa_result["question"]
-        extracted_answer = qa_result["answer"]
+async def get_qdrant_helper(workspace_id: str) -> VectorStore:
+    return await qdrant_registry.get(workspace_id)
 
-        try:
-            vector_question = embedder.encode(extracted_question)
-        except Exception as e:
-            raise EmbeddingException(f"Error creating embedding: {str(e)}")
 
+async def hydrate_search_results(
+    workspace_id: str,
+    batch_results: List[List[Dict]]
+) -> List[List[GetAnswerResultResponse]]:
+    """Turn vector hits into responses, reading Postgres only for hits without a lean payload"""
+    if config.search_hydration == "payload":
+        ticket_ids = {result["ticket_id"] for results in batch_results for result in results if not result["is_lean"]}
+    else:
+        ticket_ids = {result["ticket_id"] for results in batch_results for result in results}
+
+    qas_by_ticket = {}
+    if ticket_ids:
         try:
-            qdrant_helper = get_qdrant_helper(workspace_id)
-            qdrant_helper.add_vector(vector_question, body.model_dump())
+            with span("hydration"):
+                async with get_db_context() as db:
+                    qas = await get_qa(db, workspace_id, list(ticket_ids))
         except Exception as e:
-            raise VectorStoreException(f"Error saving to vector store: {str(e)}")
+            raise DatabaseException(f"Error getting data from database: {str(e)}")
+        qas_by_ticket = {qa.ticket_id: qa for qa in qas}
 
-        try:
-            with get_db_context() as db:
-                save_qa(
+    hydrated = []
+    for results in batch_results:
+        responses = []
+        for result in results:
+            qa = qas_by_ticket.get(result["ticket_id"])
+            if qa is not None:
+                question, answer = qa.question, qa.answer
+            elif result["ticket_id"] not in ticket_ids:
+                question, answer = result["question"], result["answer"]
+            else:
+                continue
+            responses.append(GetAnswerResultResponse(
+                question=question,
+                answer=answer,
+                # Float rounding can put an identical vector's cosine a hair above 1.0
+                similarity=min(result["score"], 1.0),
+                ticket_id=int(result["ticket_id"])
+            ))
+        hydrated.append(responses)
+    return hydrated
+
+
+async def find_exact_matches(workspace_id: str, question: str, top_k: int) -> List[GetAnswerResultResponse]:
+    """Stored Q&A pairs whose question equals the query after normalization, scored 1.0"""
+    if config.exact_match_mode == "off":
+        return []
+
+    try:
+        with span("exact_match"):
+            async with get_db_context() as db:
+                qas = await get_qa_by_question(db, workspace_id, question, limit=top_k)
+    except Exception as e:
+        raise DatabaseException(f"Error getting data from database: {str(e)}")
+
+    exact_match_stats["hits" if qas else "misses"] += 1
+    return [
+        GetAnswerResultResponse(
+            question=qa.question,
+            answer=qa.answer,
+            similarity=1.0,
+            ticket_id=int(qa.ticket_id)
+        )
+        for qa in qas
+    ]
+
+
+def needs_vector_search(exact_results: List[GetAnswerResultResponse], top_k: int) -> bool:
+    return not exact_results or (config.exact_match_mode == "merge" and len(exact_results) < top_k)
+
+
+def merge_results(
+    exact_results: List[GetAnswerResultResponse],
+    vector_results: List[GetAnswerResultResponse],
+    top_k: int
+) -> List[GetAnswerResultResponse]:
+    """Exact matches first, then vector hits for other tickets"""
+    exact_ticket_ids = {result.ticket_id for result in exact_results}
+    return (exact_results + [result for result in vector_results if result.ticket_id not in exact_ticket_ids])[:top_k]
+
+
+async def get_query_embedding(question: str):
+    vector = await embedding_cache.get(question)
+    if vector is None:
+        vector = await embedding_batcher.encode(question)
+        await embedding_cache.set(question, vector)
+    return vector
+
+
+async def get_query_embeddings(questions: List[str]) -> np.ndarray:
+    """Cache-aware embedding of several questions; all misses are encoded in one call"""
+    vectors = [await embedding_cache.get(question) for question in questions]
+    missing = [index for index, vector in enumerate(vectors) if vector is None]
+    if missing:
+        started = time.perf_counter()
+        with span("embed"):
+            encoded = await embedder.aencode([questions[index] for index in missing])
+        EMBED_SECONDS.observe(time.perf_counter() - started, current_workspace())
+        for index, vector in zip(missing, encoded):
+            vectors[index] = vector
+            await embedding_cache.set(questions[index], vector)
+    return np.stack(vectors)
+
+
+async def run_save_pipeline(
+    body: SaveQABody,
+    workspace_id: str,
+    progress: Optional[ProgressCallback] = None
+) -> SaneQAResponse:
+    async def report(stage: str):
+        if progress is not None:
+            await progress(stage)
+
+    try:
+        with span("db_read"):
+            async with get_db_context() as db:
+                existing = await get_qa_by_ticket_id(db, workspace_id, body.ticket_id)
+        if existing:
+            return SaneQAResponse(
+                status="success",
+                message="Ticket already saved",
+                extracted_question=existing.question,
+                extracted_answer=existing.answer,
+                ticket_id=int(existing.ticket_id),
+                already_saved=True
+            )
+    except Exception as e:
+        raise DatabaseException(f"Error checking existing ticket: {str(e)}")
+
+    if dialog_compactor is not None:
+        # Tokenizing is CPU-bound, and the first call may still be loading the encoding
+        compacted = await asyncio.to_thread(dialog_compactor.compact, body.dialog)
+        full_dialog_text = compacted.text
+        logger.debug(
+            "Ticket %s dialog compacted from %d to %d tokens",
+            body.ticket_id, compacted.tokens_before, compacted.tokens_after
+        )
+    else:
+        full_dialog_text = build_dialog_text(body.dialog)
+
+    duplicate, signature = None, None
+    if near_duplicates is not None:
+        signature = near_duplicates.signature(full_dialog_text)
+        duplicate = await near_duplicates.find(workspace_id, signature)
+
+    decision = None
+    if duplicate is None and prefilter is not None:
+        decision = await prefilter.evaluate(workspace_id, body.ticket_id, body.dialog)
+
+    if duplicate is not None:
+        qa_result = {"question": duplicate.question, "answer": duplicate.answer} if duplicate.question else None
+    elif decision is not None and not decision.accepted and prefilter.blocks_extraction:
+        qa_result = None
+    else:
+        await report("extracting")
+        if extraction_cache is not None:
+            qa_result, api_failed = await extraction_cache.get_or_extract(full_dialog_text, llm_client.extract_qa_pair_with_status)
+        else:
+            qa_result, api_failed = await llm_client.extract_qa_pair_with_status(full_dialog_text)
+        # An empty result from a failed API call says nothing about the dialog
+        if decision is not None and not api_failed:
+            prefilter.record_outcome(workspace_id, body.ticket_id, decision, bool(qa_result))
+        if not qa_result and not api_failed and signature is not None:
+            await near_duplicates.record(workspace_id, body.ticket_id, signature, None, None)
+        if not qa_result and api_failed:
+            # Raised so the ingestion worker reschedules the job instead of completing it
+            raise LLMException("LLM provider request failed, Q&A extraction did not complete")
+
+    if not qa_result:
+        return SaneQAResponse(
+            status="error",
+            message="No high-quality Q&A pair found in dialog. Dialog may not contain business-relevant questions or clear answers."
+        )
+    
+    extracted_question = qa_result["question"]
+    extracted_answer = qa_result["answer"]
+
+    await report("embedding")
+    try:
+        vector_question = await embedding_batcher.encode(extracted_question)
+    except Exception as e:
+        raise EmbeddingException(f"Error creating embedding: {str(e)}")
+
+    created_at = datetime.now()
+
+    await report("indexing")
+    try:
+        qdrant_helper = await get_qdrant_helper(workspace_id)
+        await qdrant_helper.add_vector(
+            vector_question,
+            build_point_payload(body.ticket_id, extracted_question, extracted_answer, created_at)
+        )
+    except Exception as e:
+        raise VectorStoreException(f"Error saving to vector store: {str(e)}")
+
+    await report("saving")
+    try:
+        with span("db_write"):
+            async with get_db_context() as db:
+                await save_qa(
                     db=db,
                     workspace_id=workspace_id,
                     ticket_id=body.ticket_id,
                     question=extracted_question,
                     answer=extracted_answer,
-                    source=body.model_dump()
+                    source=body.model_dump(),
+                    created_at=created_at
                 )
-        except Exception as e:
-            raise DatabaseException(f"Error saving to database: {str(e)}")
+    except Exception as e:
+        raise DatabaseException(f"Error saving to database: {str(e)}")
 
-        return SaneQAResponse(
-            status="success",
-            message="QA pair successfully saved",
-            extracted_question=extracted_question,
-            extracted_answer=extracted_answer,
-            ticket_id=int(body.ticket_id),
-            already_saved=False
-        )
+    search_cache.invalidate(workspace_id)
+    if duplicate is None and signature is not None:
+        await near_duplicates.record(workspace_id, body.ticket_id, signature, extracted_question, extracted_answer)
+
+    return SaneQAResponse(
+        status="success",
+        message=(
+            f"QA pair successfully saved (reused from near-duplicate ticket {duplicate.ticket_id})"
+            if duplicate is not None else "QA pair successfully saved"
+        ),
+        extracted_question=extracted_question,
+        extracted_answer=extracted_answer,
+        ticket_id=int(body.ticket_id),
+        already_saved=False
+    )
+
+
+async def process_ingestion_job(job: IngestionJobModel, progress: ProgressCallback) -> dict:
+    body = SaveQABody.model_validate(job.payload)
+    token = bind_request_labels(RequestLabels(job.workspace_id))
+    try:
+        result = await run_save_pipeline(body, job.workspace_id, progress)
+    finally:
+        reset_request_labels(token)
+    return result.model_dump(mode="json")
+
+
+ingestion_pool = IngestionWorkerPool(
+    process=process_ingestion_job,
+    concurrency=config.ingestion_workers,
+    retry_delay_seconds=config.ingestion_retry_delay_seconds,
+    poll_interval_seconds=config.ingestion_poll_interval_seconds,
+    lock_timeout_seconds=config.ingestion_lock_timeout_seconds
+)
+
+
+async def enqueue_save(body: SaveQABody, workspace_id: str) -> SaneQAResponse:
+    try:
+        async with get_db_context() as db:
+            existing = await get_qa_by_ticket_id(db, workspace_id, body.ticket_id)
+            if existing:
+                return SaneQAResponse(
+                    status="success",
+                    message="Ticket already saved",
+                    extracted_question=existing.question,
+                    extracted_answer=existing.answer,
+                    ticket_id=int(existing.ticket_id),
+                    already_saved=True
+                )
+
+            job = await get_active_job_for_ticket(db, workspace_id, body.ticket_id)
+            if job is None:
+                job = await create_job(
+                    db,
+                    workspace_id=workspace_id,
+                    ticket_id=body.ticket_id,
+                    payload=body.model_dump(mode="json"),
+                    max_attempts=config.ingestion_max_attempts
+                )
+    except Exception as e:
+        raise DatabaseException(f"Error queueing ticket: {str(e)}")
+
+    ingestion_pool.notify()
+    return SaneQAResponse(
+        status="queued",
+        message="Ticket queued for processing",
+        ticket_id=int(body.ticket_id),
+        job_id=job.id
+    )
+
+
+@router.post("/save", response_model=SaneQAResponse)
+async def save_qa_handler(
+    body: SaveQABody,
+    response: Response,
+    workspace_id: str = Depends(get_current_workspace)
+) -> SaneQAResponse:
+    try:
+        if config.ingestion_mode == "async":
+            result = await enqueue_save(body, workspace_id)
+            if result.status == "queued":
+                response.status_code = status.HTTP_202_ACCEPTED
+            return result
+
+        return await run_save_pipeline(body, workspace_id)
         
     except (DatabaseException, LLMException, EmbeddingException, VectorStoreException):
         raise
@@ -107,43 +459,89 @@ async def save_qa_handler(body: SaveQABody, workspace_id: str = Depends(get_curr
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/save/batch", response_model=SaveQABatchResponse)
+async def save_qa_batch_handler(
+    body: SaveQABatchBody,
+    workspace_id: str = Depends(get_current_workspace)
+) -> SaveQABatchResponse:
+    try:
+        result = await backfill_runner.run_batch(workspace_id, body.items)
+        if result.saved:
+            search_cache.invalidate(workspace_id)
+    except (DatabaseException, LLMException, EmbeddingException, VectorStoreException):
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    return SaveQABatchResponse(
+        results=result.results,
+        total=result.total,
+        saved=result.saved,
+        already_saved=result.already_saved,
+        no_qa=result.no_qa,
+        failed=result.failed,
+        elapsed_seconds=result.elapsed_seconds,
+        tickets_per_second=result.tickets_per_second
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_job_handler(job_id: str, workspace_id: str = Depends(get_current_workspace)) -> IngestionJobResponse:
+    try:
+        async with get_db_context() as db:
+            job = await get_job(db, workspace_id, job_id)
+    except Exception as e:
+        raise DatabaseException(f"Error getting job from database: {str(e)}")
+
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return IngestionJobResponse(
+        job_id=job.id,
+        ticket_id=job.ticket_id,
+        status=job.status,
+        stage=job.stage,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        last_error=job.last_error,
+        result=job.result,
+        created_at=job.created_at,
+        updated_at=job.updated_at
+    )
+
+
 @router.post("/search", response_model=GetAnswerResponse)
 async def get_answer_handler(body: GetAnswerBody, workspace_id: str = Depends(get_current_workspace)) -> GetAnswerResponse:
+    generation = search_cache.generation(workspace_id)
+    cached = search_cache.get(workspace_id, body.question, body.top_k)
+    if cached is not None:
+        return cached.model_copy(update={"query": body.question, "timestamp": datetime.now()})
+
     try:
-        try:
-            vector_question = embedder.encode(body.question)
-        except Exception as e:
-            raise EmbeddingException(f"Error creating embedding: {str(e)}")
+        results = await find_exact_matches(workspace_id, body.question, body.top_k)
 
-        try:
-            qdrant_helper = get_qdrant_helper(workspace_id)
-            search_results = qdrant_helper.search_similar(vector_question, body.top_k)
-        except Exception as e:
-            raise VectorStoreException(f"Error searching in vector store: {str(e)}")
+        if needs_vector_search(results, body.top_k):
+            try:
+                vector_question = await get_query_embedding(body.question)
+            except Exception as e:
+                raise EmbeddingException(f"Error creating embedding: {str(e)}")
 
-        try:
-            with get_db_context() as db:
-                ticket_ids = [result["ticket_id"] for result in search_results]
-                qas = get_qa(db, workspace_id, ticket_ids)
-                
-                results = []
-                for result in search_results:
-                    qa = next((qa for qa in qas if qa.ticket_id == result["ticket_id"]), None)
-                    if qa:
-                        results.append(GetAnswerResultResponse(
-                            question=qa.question,
-                            answer=qa.answer,
-                            similarity=result["score"],
-                            ticket_id=int(qa.ticket_id)
-                        ))
-        except Exception as e:
-            raise DatabaseException(f"Error getting data from database: {str(e)}")
+            try:
+                qdrant_helper = await get_qdrant_helper(workspace_id)
+                search_results = await qdrant_helper.search_similar(vector_question, body.top_k)
+            except Exception as e:
+                raise VectorStoreException(f"Error searching in vector store: {str(e)}")
 
-        return GetAnswerResponse(
+            vector_results = (await hydrate_search_results(workspace_id, [search_results]))[0]
+            results = merge_results(results, vector_results, body.top_k)
+
+        response = GetAnswerResponse(
             query=body.question,
             results=results,
             total_found=len(results)
         )
+        search_cache.set(workspace_id, body.question, body.top_k, response, generation)
+        return response
         
     except (DatabaseException, EmbeddingException, VectorStoreException):
         raise
@@ -152,6 +550,52 @@ async def get_answer_handler(body: GetAnswerBody, workspace_id: str = Depends(ge
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@router.post("/search/batch", response_model=GetAnswerBatchResponse)
+async def get_answer_batch_handler(
+    body: GetAnswerBatchBody,
+    workspace_id: str = Depends(get_current_workspace)
+) -> GetAnswerBatchResponse:
+    """Same ranking as /qa/search per question: exact matches, then one batched vector search for the rest"""
+    try:
+        per_question = list(await asyncio.gather(
+            *(find_exact_matches(workspace_id, question, body.top_k) for question in body.questions)
+        ))
+        pending = [index for index, exact_results in enumerate(per_question) if needs_vector_search(exact_results, body.top_k)]
+
+        if pending:
+            try:
+                vector_questions = await get_query_embeddings([body.questions[index] for index in pending])
+            except Exception as e:
+                raise EmbeddingException(f"Error creating embeddings: {str(e)}")
+
+            try:
+                qdrant_helper = await get_qdrant_helper(workspace_id)
+                batch_results = await qdrant_helper.search_similar_batch(vector_questions, body.top_k)
+            except Exception as e:
+                raise VectorStoreException(f"Error searching in vector store: {str(e)}")
+
+            hydrated = await hydrate_search_results(workspace_id, batch_results)
+            for index, vector_results in zip(pending, hydrated):
+                per_question[index] = merge_results(per_question[index], vector_results, body.top_k)
+
+        responses = [
+            GetAnswerResponse(
+                query=question,
+                results=results,
+                total_found=len(results)
+            )
+            for question, results in zip(body.questions, per_question)
+        ]
+
+        return GetAnswerBatchResponse(results=responses)
+
+    except (DatabaseException, EmbeddingException, VectorStoreException):
+        raise
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
 @router.get("/metrics")
 async def get_performance_metrics(_: str = Depends(get_current_workspace)):
     """Get performance metrics for Q&A extraction (OpenAI only)"""
@@ -161,7 +605,17 @@ async def get_performance_metrics(_: str = Depends(get_current_workspace)):
     if not stats:
         return {
             "message": "No performance data available yet",
-            "total_extractions": 0
+            "total_extractions": 0,
+            "embedding_batching": embedding_batcher.get_stats(),
+            "embedding_cache": embedding_cache.get_stats(),
+            "search_cache": search_cache.get_stats(),
+            "exact_match": exact_match_stats,
+            "near_duplicates": near_duplicates.get_stats() if near_duplicates else None,
+            "extraction_cache": extraction_cache.get_stats() if extraction_cache else None,
+            "dialog_compaction": dialog_compactor.get_stats() if dialog_compactor else None,
+            "llm_resilience": llm_client.resilience.get_stats(),
+            "streaming_extraction": llm_client.streaming_stats,
+            "prefilter": prefilter.get_stats() if prefilter else None
         }
     
     # Add cost comparison and recommendations
@@ -177,6 +631,16 @@ async def get_performance_metrics(_: str = Depends(get_current_workspace)):
             "success_rate": "✅ Excellent" if stats.get('success_rate', 0) > 0.95 else "⚠️ Needs attention",
             "cost_efficiency": "✅ Optimal" if stats.get('avg_cost_per_extraction', 0) < 0.005 else "⚠️ High cost"
         },
+        "embedding_batching": embedding_batcher.get_stats(),
+        "embedding_cache": embedding_cache.get_stats(),
+        "search_cache": search_cache.get_stats(),
+        "exact_match": exact_match_stats,
+        "near_duplicates": near_duplicates.get_stats() if near_duplicates else None,
+        "extraction_cache": extraction_cache.get_stats() if extraction_cache else None,
+        "dialog_compaction": dialog_compactor.get_stats() if dialog_compactor else None,
+        "llm_resilience": llm_client.resilience.get_stats(),
+        "streaming_extraction": llm_client.streaming_stats,
+        "prefilter": prefilter.get_stats() if prefilter else None,
         "recommendations": []
     }
     
@@ -194,3 +658,29 @@ async def get_performance_metrics(_: str = Depends(get_current_workspace)):
         response["recommendations"] = ["All metrics within optimal ranges"]
     
     return response
+
+
+@router.get("/admin/extraction-cache")
+async def get_extraction_cache_handler(_: None = Depends(get_admin)):
+    """Cached extraction entries per prompt version"""
+    if extraction_cache is None:
+        raise HTTPException(status_code=404, detail="Extraction cache is disabled")
+    try:
+        return {
+            "current_prompt_version": extraction_cache.prompt_version,
+            "entries": await extraction_cache.count_by_prompt_version()
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@router.delete("/admin/extraction-cache/{prompt_version}")
+async def purge_extraction_cache_handler(prompt_version: str, _: None = Depends(get_admin)):
+    """Delete all cached extraction entries produced by one prompt version"""
+    if extraction_cache is None:
+        raise HTTPException(status_code=404, detail="Extraction cache is disabled")
+    try:
+        purged = await extraction_cache.purge(prompt_version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    return {"prompt_version": prompt_version, "purged": purged}
@@ -0,0 +1,56 @@
+"""Add and fill the qa.question_hash column used by the exact-match search path.
+
+    python -m app.cli.add_question_hash
+
+Safe to run repeatedly: the column and index are created only when missing and
+only rows without a hash are filled. The service and the backfill CLI create
+the column on startup; this command is still needed to hash existing rows.
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import bindparam, select, update
+
+from app.core.database import engine, ensure_question_hash_column
+from app.models.database import QAModel
+from app.services.normalization import question_hash
+
+
+async def fill_hashes(batch_size: int) -> int:
+    filled = 0
+    statement = (
+        update(QAModel.__table__)
+        .where(QAModel.__table__.c.id == bindparam("row_id"))
+        .values(question_hash=bindparam("hash"))
+    )
+    while True:
+        async with engine.begin() as conn:
+            rows = (await conn.execute(
+                select(QAModel.id, QAModel.question)
+                .where(QAModel.question_hash.is_(None))
+                .limit(batch_size)
+            )).all()
+            if not rows:
+                return filled
+            await conn.execute(statement, [{"row_id": row.id, "hash": question_hash(row.question)} for row in rows])
+        filled += len(rows)
+        print(f"Filled {filled} rows")
+
+
+async def run(args: argparse.Namespace):
+    try:
+        await ensure_question_hash_column()
+        filled = await fill_hashes(args.batch_size)
+        print(f"Done: {filled} rows updated")
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add and backfill qa.question_hash")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows updated per transaction")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Apply a collection profile (quantization, on-disk vectors, HNSW settings) to existing workspace collections.
+
+    python -m app.cli.apply_profile --workspace it_support --profile scalar_int8
+
+Without --profile each workspace gets the profile configured for it
+(QDRANT_WORKSPACE_PROFILES, falling back to QDRANT_COLLECTION_PROFILE).
+Qdrant rebuilds quantized data and indexes in the background; searches keep working meanwhile.
+"""
+import argparse
+import asyncio
+
+from app.core.config import get_config
+from app.services.qdrant import QdrantRegistry
+from app.services.qdrant_profiles import COLLECTION_PROFILES, get_collection_profile
+
+
+async def run(args: argparse.Namespace):
+    config = get_config()
+    registry = QdrantRegistry.from_config(config)
+    workspaces = args.workspace or list(config.workspace_tokens)
+
+    try:
+        for workspace_id in workspaces:
+            if registry.backend_for(workspace_id) != "qdrant":
+                print(f"{workspace_id}: skipped, uses the {registry.backend_for(workspace_id)} vector store")
+                continue
+            profile = registry.profile_for(workspace_id)
+            if args.profile:
+                profile = get_collection_profile(
+                    args.profile,
+                    hnsw_m=config.qdrant_hnsw_m,
+                    hnsw_ef_construct=config.qdrant_hnsw_ef_construct,
+                    hnsw_ef=config.qdrant_hnsw_ef
+                )
+            qdrant_helper = await registry.get(workspace_id)
+            await qdrant_helper.apply_profile(profile)
+            print(f"{workspace_id}: applied profile '{profile.name}' to {qdrant_helper.collection_name}")
+    finally:
+        await registry.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a collection profile to existing workspace collections")
+    parser.add_argument("--workspace", action="append", help="Workspace to update (repeatable, default: all configured)")
+    parser.add_argument("--profile", choices=list(COLLECTION_PROFILES), help="Profile to apply (default: configured profile)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Offline backfill of historical tickets from a JSONL file.
+
+Each input line is a /qa/save body: {"ticket_id": ..., "question": ..., "dialog": [...]}.
+
+    python -m app.cli.backfill tickets.jsonl --workspace it_support
+
+Progress is checkpointed after every batch, so an interrupted run resumes
+from the last completed batch when started again with the same checkpoint.
+Tickets whose extraction failed (e.g. during an LLM provider outage) are
+appended to a retry file in the same format, to be backfilled again later:
+
+    python -m app.cli.backfill tickets.jsonl.failed.jsonl --workspace it_support
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Iterator, List, Tuple
+
+from pydantic import ValidationError
+
+from app.core.database import engine, ensure_question_hash_column
+from app.models.database import BaseModel
+from app.models.schemas import SaveQABody
+
+
+def read_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"line": 0, "saved": 0, "already_saved": 0, "no_qa": 0, "failed": 0, "invalid": 0}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_checkpoint(path: str, checkpoint: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def append_failed(path: str, items: List[SaveQABody], ticket_ids: List[int]):
+    failed = set(ticket_ids)
+    with open(path, "a", encoding="utf-8") as f:
+        for item in items:
+            if item.ticket_id in failed:
+                f.write(item.model_dump_json() + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def iter_batches(path: str, start_line: int, batch_size: int) -> Iterator[Tuple[int, List[SaveQABody], int]]:
+    """Yield (last line number, parsed tickets, invalid line count) per batch, skipping already processed lines"""
+    batch: List[SaveQABody] = []
+    invalid = 0
+    line_number = 0
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if line_number <= start_line or not line.strip():
+                continue
+            try:
+                batch.append(SaveQABody.model_validate_json(line))
+            except ValidationError as e:
+                print(f"Skipping invalid line {line_number}: {e.errors()[0]['msg']}")
+                invalid += 1
+            if len(batch) >= batch_size:
+                yield line_number, batch, invalid
+                batch, invalid = [], 0
+    if batch or invalid:
+        yield line_number, batch, invalid
+
+
+async def run(args: argparse.Namespace):
+    from app.api.qa_routes import backfill_runner, qdrant_registry
+
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+    await ensure_question_hash_column()
+
+    checkpoint_path = args.checkpoint or f"{args.input}.checkpoint.json"
+    failed_path = args.failed_output or f"{args.input}.failed.jsonl"
+    checkpoint = read_checkpoint(checkpoint_path)
+    if checkpoint["line"]:
+        print(f"Resuming after line {checkpoint['line']}")
+
+    started = time.perf_counter()
+    processed = 0
+    try:
+        for last_line, items, invalid in iter_batches(args.input, checkpoint["line"], args.batch_size):
+            if items:
+                result = await backfill_runner.run_batch(args.workspace, items)
+                for key in ("saved", "already_saved", "no_qa", "failed"):
+                    checkpoint[key] += getattr(result, key)
+                processed += result.total
+                # Written before the checkpoint moves past the batch, so no failed ticket is lost
+                if result.failed_ticket_ids:
+                    append_failed(failed_path, items, result.failed_ticket_ids)
+                batch_rate = result.tickets_per_second
+            else:
+                batch_rate = 0.0
+            checkpoint["invalid"] += invalid
+            checkpoint["line"] = last_line
+            write_checkpoint(checkpoint_path, checkpoint)
+
+            overall_rate = processed / (time.perf_counter() - started)
+            print(
+                f"line {last_line}: batch {batch_rate:.1f} tickets/s, overall {overall_rate:.1f} tickets/s "
+                f"(saved={checkpoint['saved']} already_saved={checkpoint['already_saved']} "
+                f"no_qa={checkpoint['no_qa']} failed={checkpoint['failed']} invalid={checkpoint['invalid']})"
+            )
+    finally:
+        await qdrant_registry.close()
+        await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    print(f"Done: {processed} tickets in {elapsed:.1f}s ({processed / elapsed if elapsed else 0.0:.1f} tickets/s)")
+    if checkpoint["failed"]:
+        print(f"{checkpoint['failed']} failed tickets were written to {failed_path} for a retry run")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill historical tickets into the Q&A index")
+    parser.add_argument("input", help="JSONL file with one /qa/save body per line")
+    parser.add_argument("--workspace", required=True, help="Workspace ID to save tickets into")
+    parser.add_argument("--batch-size", type=int, default=256, help="Tickets per extraction/embedding batch")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <input>.checkpoint.json)")
+    parser.add_argument("--failed-output", help="Retry file for failed tickets (default: <input>.failed.jsonl)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Export the embedding model to ONNX and dynamically int8-quantized ONNX, then validate both against torch.
+
+    python -m app.cli.export_onnx --output ./models/all-MiniLM-L6-v2
+
+Point EMBEDDING_MODEL_NAME at the output directory and set EMBEDDING_BACKEND to
+onnx or onnx_int8 (and EMBEDDING_ONNX_FILE_NAME if a non-avx2 quantization was used).
+Exits non-zero when any backend's cosine agreement with torch is below --min-cosine.
+"""
+import argparse
+import sys
+import time
+from typing import List
+
+import numpy as np
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+from app.services.embeddings import load_sentence_transformer
+
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+SAMPLE_TEXTS = [
+    "How do I reset my password?",
+    "Go to Settings → Security → Reset Password",
+    "Why is my invoice not showing up in the billing section?",
+    "Can I export the report to Excel?",
+    "The application crashes when I open the settings page",
+    "Как сбросить пароль от личного кабинета?",
+    "Не проходит синхронизация с 1С, что делать?",
+    "Where can I download the latest version of the mobile app?",
+    "Is it possible to add another user to my account?",
+    "Clear the browser cache and sign in again",
+    "Does the API support pagination for the orders endpoint?",
+    "Our VPN connection drops every few minutes since the last update",
+]
+
+
+def load_samples(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def compare(reference: np.ndarray, candidate: np.ndarray) -> dict:
+    # Both are L2-normalized, so the row-wise dot product is the cosine similarity
+    cosines = np.sum(reference * candidate, axis=1)
+    reference_neighbours = np.argsort(-(reference @ reference.T), axis=1)[:, 1]
+    candidate_neighbours = np.argsort(-(candidate @ candidate.T), axis=1)[:, 1]
+    return {
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "nearest_neighbour_agreement": float(np.mean(reference_neighbours == candidate_neighbours)),
+    }
+
+
+def timed_encode(model: SentenceTransformer, texts: List[str], repeats: int = 5) -> tuple:
+    embeddings = model.encode(texts, normalize_embeddings=True)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        model.encode(texts, normalize_embeddings=True)
+    return embeddings, (time.perf_counter() - started) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and validate ONNX embedding backends")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Model name or path to export")
+    parser.add_argument("--output", required=True, help="Directory to save the exported model to")
+    parser.add_argument(
+        "--quantization",
+        default="avx2",
+        choices=["arm64", "avx2", "avx512", "avx512_vnni"],
+        help="Dynamic int8 quantization target"
+    )
+    parser.add_argument("--samples", help="Text file with one validation sentence per line")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Minimum per-sentence cosine vs torch")
+    args = parser.parse_args()
+
+    texts = load_samples(args.samples) if args.samples else SAMPLE_TEXTS
+
+    print(f"Exporting {args.model} to ONNX in {args.output}")
+    onnx_model = SentenceTransformer(args.model, backend="onnx")
+    onnx_model.save_pretrained(args.output)
+    export_dynamic_quantized_onnx_model(onnx_model, quantization_config=args.quantization, model_name_or_path=args.output)
+    int8_file_name = f"onnx/model_qint8_{args.quantization}.onnx"
+
+    reference, torch_ms = timed_encode(load_sentence_transformer(args.model, "torch"), texts)
+    print(f"{'torch':>10}: {torch_ms:.1f} ms/batch")
+
+    passed = True
+    for backend, file_name in (("onnx", None), ("onnx_int8", int8_file_name)):
+        embeddings, elapsed_ms = timed_encode(load_sentence_transformer(args.output, backend, file_name), texts)
+        report = compare(reference, embeddings)
+        ok = report["min_cosine"] >= args.min_cosine
+        passed = passed and ok
+        print(
+            f"{backend:>10}: {elapsed_ms:.1f} ms/batch, min cosine {report['min_cosine']:.4f}, "
+            f"mean cosine {report['mean_cosine']:.4f}, "
+            f"nearest neighbour agreement {report['nearest_neighbour_agreement']:.2%} "
+            f"[{'OK' if ok else 'FAIL'}]"
+        )
+
+    print(f"int8 model file: {int8_file_name}")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
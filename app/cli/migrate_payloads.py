@@ -0,0 +1,84 @@
+"""Rewrite legacy Qdrant point payloads (full /qa/save bodies) into the lean search payload.
+
+    python -m app.cli.migrate_payloads [--workspace it_support] [--dry-run]
+
+Question, answer and created_at are taken from the qa table. Points without a
+matching qa row are left untouched and reported.
+"""
+import argparse
+import asyncio
+
+from app.core.config import get_config
+from app.core.database import engine, get_db_context
+from app.services.qa_service import get_qa
+from app.services.qdrant import QdrantRegistry, build_point_payload, is_lean_payload
+
+
+async def migrate_workspace(registry: QdrantRegistry, workspace_id: str, page_size: int, dry_run: bool) -> dict:
+    qdrant_helper = await registry.get(workspace_id)
+    stats = {"scanned": 0, "migrated": 0, "already_lean": 0, "missing_in_db": 0}
+
+    offset = None
+    while True:
+        points, offset = await qdrant_helper.scroll_points(offset=offset, limit=page_size)
+        stats["scanned"] += len(points)
+
+        legacy = {}
+        for point in points:
+            if is_lean_payload(point.payload):
+                stats["already_lean"] += 1
+            else:
+                legacy[point.id] = (point.payload or {}).get("ticket_id", point.id)
+
+        if legacy:
+            async with get_db_context() as db:
+                qas = await get_qa(db, workspace_id, list(legacy.values()))
+            qas_by_ticket = {qa.ticket_id: qa for qa in qas}
+
+            payloads = {}
+            for point_id, ticket_id in legacy.items():
+                qa = qas_by_ticket.get(ticket_id)
+                if qa is None:
+                    stats["missing_in_db"] += 1
+                    continue
+                payloads[point_id] = build_point_payload(qa.ticket_id, qa.question, qa.answer, qa.created_at)
+
+            if not dry_run:
+                await qdrant_helper.overwrite_payloads(payloads)
+            stats["migrated"] += len(payloads)
+
+        if offset is None:
+            return stats
+
+
+async def run(args: argparse.Namespace):
+    config = get_config()
+    registry = QdrantRegistry.from_config(config)
+    workspaces = args.workspace or list(config.workspace_tokens)
+
+    try:
+        for workspace_id in workspaces:
+            if registry.backend_for(workspace_id) != "qdrant":
+                print(f"{workspace_id}: skipped, uses the {registry.backend_for(workspace_id)} vector store")
+                continue
+            stats = await migrate_workspace(registry, workspace_id, args.page_size, args.dry_run)
+            prefix = "[dry run] " if args.dry_run else ""
+            print(
+                f"{prefix}{workspace_id}: scanned={stats['scanned']} migrated={stats['migrated']} "
+                f"already_lean={stats['already_lean']} missing_in_db={stats['missing_in_db']}"
+            )
+    finally:
+        await registry.close()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rewrite Qdrant point payloads into the lean search payload")
+    parser.add_argument("--workspace", action="append", help="Workspace to migrate (repeatable, default: all configured)")
+    parser.add_argument("--page-size", type=int, default=256, help="Points per scroll page and payload update request")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
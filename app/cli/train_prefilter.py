@@ -0,0 +1,97 @@
+"""Train the optional pre-filter model: logistic regression over embeddings of the opening user turns.
+
+Input is JSONL with one labelled dialog per line, where has_qa is whether the
+full LLM pipeline extracted a Q&A pair:
+
+    {"dialog": [{"role": "user", "content": "..."}, ...], "has_qa": true}
+
+    python -m app.cli.train_prefilter labelled.jsonl --output prefilter.npz
+
+Point PREFILTER_MODEL_PATH at the output file. Metrics are reported on a
+held-out split at the configured PREFILTER_THRESHOLD.
+"""
+import argparse
+import json
+from typing import List, Tuple
+
+import numpy as np
+
+from app.core.config import get_config
+from app.models.schemas import Dialog
+from app.services.embeddings import Embedder
+from app.services.prefilter import opening_user_text, rule_score
+
+
+def load_examples(path: str) -> Tuple[List[List[Dialog]], np.ndarray]:
+    dialogs, labels = [], []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            dialogs.append([Dialog.model_validate(message) for message in record["dialog"]])
+            labels.append(1.0 if record["has_qa"] else 0.0)
+    return dialogs, np.asarray(labels, dtype=np.float32)
+
+
+def train_logistic(features: np.ndarray, labels: np.ndarray, epochs: int, learning_rate: float, l2: float) -> Tuple[np.ndarray, float]:
+    coef = np.zeros(features.shape[1], dtype=np.float32)
+    intercept = 0.0
+    for _ in range(epochs):
+        predictions = 1.0 / (1.0 + np.exp(-(features @ coef + intercept)))
+        error = predictions - labels
+        coef -= learning_rate * (features.T @ error / len(labels) + l2 * coef)
+        intercept -= learning_rate * float(error.mean())
+    return coef, intercept
+
+
+def report(name: str, accepted: np.ndarray, labels: np.ndarray):
+    rejected = ~accepted
+    positives = labels == 1.0
+    rejection_precision = float(np.mean(~positives[rejected])) if rejected.any() else float("nan")
+    print(
+        f"{name:>12}: rejected {rejected.mean():.1%} of dialogs, "
+        f"rejection precision {rejection_precision:.3f}, "
+        f"lost Q&A pairs {np.sum(rejected & positives)} of {positives.sum():.0f}"
+    )
+
+
+def main():
+    config = get_config()
+    parser = argparse.ArgumentParser(description="Train the pre-filter model over dialog embeddings")
+    parser.add_argument("input", help="JSONL file with labelled dialogs")
+    parser.add_argument("--output", required=True, help="Where to write the .npz weights")
+    parser.add_argument("--threshold", type=float, default=config.prefilter_threshold)
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--learning-rate", type=float, default=1.0)
+    parser.add_argument("--l2", type=float, default=1e-3)
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of examples kept for evaluation")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    dialogs, labels = load_examples(args.input)
+    embedder = Embedder(
+        model_name=config.embedding_model_name,
+        backend=config.embedding_backend,
+        onnx_file_name=config.embedding_onnx_file_name
+    )
+    features = np.asarray(embedder.encode([opening_user_text(dialog) for dialog in dialogs]), dtype=np.float32)
+    rules = np.asarray([rule_score(dialog)[0] for dialog in dialogs], dtype=np.float32)
+
+    order = np.random.default_rng(args.seed).permutation(len(labels))
+    split = int(len(order) * (1 - args.holdout))
+    train, test = order[:split], order[split:]
+
+    coef, intercept = train_logistic(features[train], labels[train], args.epochs, args.learning_rate, args.l2)
+    np.savez(args.output, coef=coef, intercept=np.float32(intercept))
+    print(f"Trained on {len(train)} dialogs, wrote {args.output}")
+
+    model = 1.0 / (1.0 + np.exp(-(features[test] @ coef + intercept)))
+    # Rule score 0 means a hard rejection; the model is not consulted for those
+    combined = np.where(rules[test] > 0, (rules[test] + model) / 2, 0.0)
+    report("rules", rules[test] >= args.threshold, labels[test])
+    report("rules+model", combined >= args.threshold, labels[test])
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.core.config import get_config
+from app.core.metrics import set_workspace_label
 
 
 security = HTTPBearer()
@@ -50,4 +51,14 @@ def get_current_workspace(credentials: HTTPAuthorizationCredentials = Depends(se
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin token cannot be used for workspace-specific operations. Use workspace token."
         )
+    set_workspace_label(workspace_id)
     return workspace_id
+
+
+def get_admin(credentials: HTTPAuthorizationCredentials = Depends(security)) -> None:
+    verify_token(credentials)
+    if credentials.credentials != config.api_token:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
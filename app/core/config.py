@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic import BaseModel
 
@@ -15,35 +16,177 @@ class Config(BaseModel):
     openai_api_key: str | None = None
     openai_model: str = "gpt-4o-mini"
     openai_proxy_url: str | None = None
+    openai_extraction_mode: Literal["single", "two_step", "streaming"] = "single"
+    openai_initial_concurrency: int = 8
+    openai_min_concurrency: int = 1
+    openai_max_concurrency: int = 32
+    openai_max_attempts: int = 4
+    openai_retry_base_delay: float = 0.5
+    openai_retry_max_delay: float = 20.0
+    openai_breaker_failure_threshold: int = 5
+    openai_breaker_recovery_seconds: float = 30.0
+    openai_max_connections: int = 32
+    openai_max_keepalive_connections: int = 16
+
+    # Embedding settings
+    embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_backend: Literal["torch", "onnx", "onnx_int8"] = "torch"
+    embedding_onnx_file_name: str | None = None
+    embedding_max_workers: int = 1
+    embedding_batch_size: int = 32
+    embedding_batch_wait_ms: float = 5.0
+    embedding_cache_max_entries: int = 10000
+    embedding_cache_max_mb: int = 64
+    embedding_cache_ttl_seconds: int = 86400
+    embedding_cache_redis_url: str | None = None
+
+    # Search settings
+    search_hydration: Literal["payload", "database"] = "payload"
+    exact_match_mode: Literal["short_circuit", "merge", "off"] = "short_circuit"
+    search_cache_max_entries: int = 5000
+    search_cache_ttl_seconds: float = 300.0
+    
+    # Ingestion settings
+    ingestion_mode: Literal["sync", "async"] = "sync"
+    ingestion_workers: int = 4
+    ingestion_max_attempts: int = 3
+    ingestion_retry_delay_seconds: float = 30.0
+    ingestion_poll_interval_seconds: float = 1.0
+    ingestion_lock_timeout_seconds: float = 300.0
+    backfill_llm_concurrency: int = 8
+    backfill_upsert_batch_size: int = 256
+    near_duplicate_enabled: bool = True
+    near_duplicate_threshold: float = 0.9
+    near_duplicate_num_perm: int = 128
+    near_duplicate_bands: int = 32
+    extraction_cache_enabled: bool = True
+    extraction_cache_ttl_seconds: int = 30 * 86400
+    dialog_compaction_enabled: bool = True
+    dialog_token_budget: int = 3000
+    prefilter_mode: Literal["off", "shadow", "enforce"] = "shadow"
+    prefilter_threshold: float = 0.3
+    prefilter_model_path: str | None = None
+
+    # Tracing settings
+    tracing_exporter: Literal["none", "jsonl", "otlp"] = "none"
+    tracing_jsonl_path: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    tracing_slow_request_ms: float = 1000.0
     
     # Other settings
     database_url: str
     qdrant_url: str
     qdrant_collection_name: str
+    qdrant_collection_profile: str = "default"
+    qdrant_workspace_profiles: dict[str, str] = {}
+    qdrant_hnsw_m: int | None = None
+    qdrant_hnsw_ef_construct: int | None = None
+    qdrant_hnsw_ef: int | None = None
+    qdrant_transport: Literal["rest", "grpc"] = "rest"
+    qdrant_grpc_port: int = 6334
+    qdrant_timeout_seconds: int | None = None
+    qdrant_pool_size: int | None = None
+    vector_store_backend: Literal["qdrant", "flat"] = "qdrant"
+    vector_store_workspace_backends: dict[str, str] = {}
+    flat_index_path: str = "./flat_index"
     api_token: str
     workspace_tokens: dict[str, str] = {}
 
+    def collection_profile_name(self, workspace_id: str) -> str:
+        return self.qdrant_workspace_profiles.get(workspace_id, self.qdrant_collection_profile)
+
+
+def _parse_workspace_map(env_name: str) -> dict[str, str]:
+    """Parse "workspace:value,workspace:value" environment variables"""
+    result = {}
+    env_value = os.getenv(env_name, "")
+    if env_value:
+        for pair in env_value.split(","):
+            if ":" in pair:
+                ws_id, value = pair.strip().split(":", 1)
+                result[ws_id] = value
+    return result
+
+
+def _optional_int(env_name: str) -> int | None:
+    value = os.getenv(env_name)
+    return int(value) if value else None
+
 
 def get_config() -> Config:
     api_token = os.getenv("API_TOKEN")
     if not api_token:
         raise ValueError("API_TOKEN environment variable is required")
     
-    workspace_tokens = {}
-    workspace_tokens_env = os.getenv("WORKSPACE_TOKENS", "")
-    if workspace_tokens_env:
-        for pair in workspace_tokens_env.split(","):
-            if ":" in pair:
-                ws_id, token = pair.strip().split(":", 1)
-                workspace_tokens[ws_id] = token
+    workspace_tokens = _parse_workspace_map("WORKSPACE_TOKENS")
     
     return Config(
         openai_api_key=os.getenv("OPENAI_API_KEY"),
         openai_model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
         openai_proxy_url=os.getenv("OPENAI_PROXY_URL"),
+        openai_extraction_mode=os.getenv("OPENAI_EXTRACTION_MODE", "single"),
+        openai_initial_concurrency=int(os.getenv("OPENAI_INITIAL_CONCURRENCY", "8")),
+        openai_min_concurrency=int(os.getenv("OPENAI_MIN_CONCURRENCY", "1")),
+        openai_max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "32")),
+        openai_max_attempts=int(os.getenv("OPENAI_MAX_ATTEMPTS", "4")),
+        openai_retry_base_delay=float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5")),
+        openai_retry_max_delay=float(os.getenv("OPENAI_RETRY_MAX_DELAY", "20.0")),
+        openai_breaker_failure_threshold=int(os.getenv("OPENAI_BREAKER_FAILURE_THRESHOLD", "5")),
+        openai_breaker_recovery_seconds=float(os.getenv("OPENAI_BREAKER_RECOVERY_SECONDS", "30.0")),
+        openai_max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "32")),
+        openai_max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "16")),
+        embedding_model_name=os.getenv("EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2"),
+        embedding_backend=os.getenv("EMBEDDING_BACKEND", "torch"),
+        embedding_onnx_file_name=os.getenv("EMBEDDING_ONNX_FILE_NAME"),
+        embedding_max_workers=int(os.getenv("EMBEDDING_MAX_WORKERS", "1")),
+        embedding_batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", "32")),
+        embedding_batch_wait_ms=float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5")),
+        embedding_cache_max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000")),
+        embedding_cache_max_mb=int(os.getenv("EMBEDDING_CACHE_MAX_MB", "64")),
+        embedding_cache_ttl_seconds=int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", "86400")),
+        embedding_cache_redis_url=os.getenv("EMBEDDING_CACHE_REDIS_URL"),
+        search_hydration=os.getenv("SEARCH_HYDRATION", "payload"),
+        exact_match_mode=os.getenv("EXACT_MATCH_MODE", "short_circuit"),
+        search_cache_max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000")),
+        search_cache_ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300")),
+        ingestion_mode=os.getenv("INGESTION_MODE", "sync"),
+        ingestion_workers=int(os.getenv("INGESTION_WORKERS", "4")),
+        ingestion_max_attempts=int(os.getenv("INGESTION_MAX_ATTEMPTS", "3")),
+        ingestion_retry_delay_seconds=float(os.getenv("INGESTION_RETRY_DELAY_SECONDS", "30")),
+        ingestion_poll_interval_seconds=float(os.getenv("INGESTION_POLL_INTERVAL_SECONDS", "1")),
+        ingestion_lock_timeout_seconds=float(os.getenv("INGESTION_LOCK_TIMEOUT_SECONDS", "300")),
+        backfill_llm_concurrency=int(os.getenv("BACKFILL_LLM_CONCURRENCY", "8")),
+        backfill_upsert_batch_size=int(os.getenv("BACKFILL_UPSERT_BATCH_SIZE", "256")),
+        near_duplicate_enabled=os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() == "true",
+        near_duplicate_threshold=float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9")),
+        near_duplicate_num_perm=int(os.getenv("NEAR_DUPLICATE_NUM_PERM", "128")),
+        near_duplicate_bands=int(os.getenv("NEAR_DUPLICATE_BANDS", "32")),
+        extraction_cache_enabled=os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true",
+        extraction_cache_ttl_seconds=int(os.getenv("EXTRACTION_CACHE_TTL_SECONDS", str(30 * 86400))),
+        dialog_compaction_enabled=os.getenv("DIALOG_COMPACTION_ENABLED", "true").lower() == "true",
+        dialog_token_budget=int(os.getenv("DIALOG_TOKEN_BUDGET", "3000")),
+        prefilter_mode=os.getenv("PREFILTER_MODE", "shadow"),
+        prefilter_threshold=float(os.getenv("PREFILTER_THRESHOLD", "0.3")),
+        prefilter_model_path=os.getenv("PREFILTER_MODEL_PATH"),
+        tracing_exporter=os.getenv("TRACING_EXPORTER", "none"),
+        tracing_jsonl_path=os.getenv("TRACING_JSONL_PATH", "traces.jsonl"),
+        tracing_otlp_endpoint=os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"),
+        tracing_slow_request_ms=float(os.getenv("TRACING_SLOW_REQUEST_MS", "1000")),
         database_url=os.getenv("DATABASE_URL", "sqlite:///./qa_support.db"),
         qdrant_url=os.getenv("QDRANT_URL", "http://localhost:6333"),
         qdrant_collection_name=os.getenv("QDRANT_COLLECTION_NAME", "qa_support"),
+        qdrant_collection_profile=os.getenv("QDRANT_COLLECTION_PROFILE", "default"),
+        qdrant_workspace_profiles=_parse_workspace_map("QDRANT_WORKSPACE_PROFILES"),
+        qdrant_hnsw_m=_optional_int("QDRANT_HNSW_M"),
+        qdrant_hnsw_ef_construct=_optional_int("QDRANT_HNSW_EF_CONSTRUCT"),
+        qdrant_hnsw_ef=_optional_int("QDRANT_HNSW_EF"),
+        qdrant_transport=os.getenv("QDRANT_TRANSPORT", "rest"),
+        qdrant_grpc_port=int(os.getenv("QDRANT_GRPC_PORT", "6334")),
+        qdrant_timeout_seconds=_optional_int("QDRANT_TIMEOUT_SECONDS"),
+        qdrant_pool_size=_optional_int("QDRANT_POOL_SIZE"),
+        vector_store_backend=os.getenv("VECTOR_STORE_BACKEND", "qdrant"),
+        vector_store_workspace_backends=_parse_workspace_map("VECTOR_STORE_WORKSPACE_BACKENDS"),
+        flat_index_path=os.getenv("FLAT_INDEX_PATH", "./flat_index"),
         api_token=api_token,
         workspace_tokens=workspace_tokens
     )
@@ -1,36 +1,71 @@
-from typing import Generator
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.orm import Session as SQLAlchemySession
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.core.config import get_config
+from app.core.metrics import DB_QUERY_SECONDS, current_workspace
+
+
+logger = logging.getLogger(__name__)
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    scheme, sep, rest = database_url.partition("://")
+    if not sep or "+" in scheme:
+        return database_url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
 
 
 config = get_config()
-engine = create_engine(config.database_url)
+engine = create_async_engine(to_async_url(config.database_url), pool_pre_ping=True)
 
-Session = sessionmaker(bind=engine)
+Session = async_sessionmaker(bind=engine, expire_on_commit=False)
 
 
-def get_db() -> Generator[SQLAlchemySession, None, None]:
-    db = Session()
-    try:
-        yield db
-    finally:
-        db.close()
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_started = time.perf_counter()
 
 
-from contextlib import contextmanager
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _observe_query_time(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "query_started", None)
+    if started is not None:
+        DB_QUERY_SECONDS.observe(time.perf_counter() - started, current_workspace())
 
-@contextmanager
-def get_db_context() -> Generator[SQLAlchemySession, None, None]:
-    db = Session()
-    try:
+
+async def ensure_question_hash_column():
+    """Add qa.question_hash and its index to tables created before they existed; create_all does not alter tables"""
+    async with engine.begin() as conn:
+        columns = await conn.run_sync(lambda sync_conn: [column["name"] for column in inspect(sync_conn).get_columns("qa")])
+        if "question_hash" not in columns:
+            await conn.execute(text("ALTER TABLE qa ADD COLUMN question_hash VARCHAR(64)"))
+            logger.info("Added qa.question_hash; run app.cli.add_question_hash to hash existing rows")
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_workspace_question_hash ON qa (workspace_id, question_hash)"))
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with Session() as db:
         yield db
-        db.commit()
-    except Exception:
-        db.rollback()
-        raise
-    finally:
-        db.close()
+
+
+@asynccontextmanager
+async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
+    async with Session() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
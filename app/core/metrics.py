@@ -0,0 +1,233 @@
+"""Always-on fixed-bucket histograms and counters exported in Prometheus text format.
+
+Children are created once per label combination; recording a sample after that
+is a bisect and three in-place updates on preallocated slots. Labels are looked
+up through at most two dict lookups so nothing is built per sample.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence
+
+# Seconds; spans sub-millisecond cache hits to multi-second LLM calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+UNKNOWN_LABEL = "-"
+
+INF_BUCKET = 'le="+Inf"'
+
+
+class RequestLabels:
+    """Per-request label holder; the auth dependency fills in the workspace once it is known"""
+
+    __slots__ = ("workspace",)
+
+    def __init__(self, workspace: str = UNKNOWN_LABEL):
+        self.workspace = workspace
+
+
+_request_labels: ContextVar[Optional[RequestLabels]] = ContextVar("request_labels", default=None)
+
+
+def bind_request_labels(labels: RequestLabels):
+    return _request_labels.set(labels)
+
+
+def reset_request_labels(token):
+    _request_labels.reset(token)
+
+
+def set_workspace_label(workspace_id: Optional[str]):
+    labels = _request_labels.get()
+    if labels is not None and workspace_id:
+        labels.workspace = workspace_id
+
+
+def current_workspace() -> str:
+    labels = _request_labels.get()
+    return labels.workspace if labels is not None else UNKNOWN_LABEL
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]):
+        if len(label_names) not in (1, 2):
+            raise ValueError("Metrics take one or two labels")
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._children: Dict = {}
+
+    @abstractmethod
+    def _new_child(self):
+        ...
+
+    def _child(self, first: str, second: Optional[str] = None):
+        """Child for one or two label values; explicit arguments avoid packing a tuple per sample"""
+        node = self._children.get(first)
+        if len(self.label_names) == 1:
+            if node is None:
+                node = self._children[first] = self._new_child()
+            return node
+        if node is None:
+            node = self._children[first] = {}
+        child = node.get(second)
+        if child is None:
+            child = node[second] = self._new_child()
+        return child
+
+    def _walk(self, node=None, prefix=()):
+        node = self._children if node is None else node
+        for value, child in node.items():
+            if len(prefix) + 1 == len(self.label_names):
+                yield prefix + (value,), child
+            else:
+                yield from self._walk(child, prefix + (value,))
+
+    def _labels(self, values: Sequence[str], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str], buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float, first: str, second: Optional[str] = None):
+        self._child(first, second).observe(value)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for values, child in self._walk():
+            cumulative = 0
+            for bound, count in zip(self.buckets, child.counts):
+                cumulative += count
+                le = f'le="{_format(bound)}"'
+                lines.append(f"{self.name}_bucket{self._labels(values, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._labels(values, INF_BUCKET)} {child.count}")
+            lines.append(f"{self.name}_sum{self._labels(values)} {_format(child.sum)}")
+            lines.append(f"{self.name}_count{self._labels(values)} {child.count}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, first: str, second: Optional[str] = None, amount: float = 1.0):
+        self._child(first, second).inc(amount)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        for values, child in self._walk():
+            lines.append(f"{self.name}_total{self._labels(values)} {_format(child.value)}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+REQUEST_SECONDS = Histogram("qna_request_duration_seconds", "End-to-end handler time", ("workspace", "handler"))
+EMBED_SECONDS = Histogram("qna_embed_duration_seconds", "Time to embed query or question texts", ("workspace",))
+QDRANT_SEARCH_SECONDS = Histogram("qna_qdrant_search_duration_seconds", "Qdrant search request time", ("workspace",))
+QDRANT_UPSERT_SECONDS = Histogram("qna_qdrant_upsert_duration_seconds", "Qdrant upsert request time", ("workspace",))
+FLAT_INDEX_SEARCH_SECONDS = Histogram("qna_flat_index_search_duration_seconds", "Flat vector index search time", ("workspace",))
+FLAT_INDEX_APPEND_SECONDS = Histogram("qna_flat_index_append_duration_seconds", "Flat vector index append time", ("workspace",))
+DB_QUERY_SECONDS = Histogram("qna_db_query_duration_seconds", "Database statement execution time", ("workspace",))
+LLM_CALL_SECONDS = Histogram("qna_llm_call_duration_seconds", "LLM API call time", ("workspace",))
+LLM_TOKENS = Counter("qna_llm_tokens", "LLM tokens used", ("workspace",))
+STAGE_ERRORS = Counter("qna_stage_errors", "Failed embed, vector store and LLM calls", ("workspace", "stage"))
+
+REGISTRY: List[_Metric] = [
+    REQUEST_SECONDS,
+    EMBED_SECONDS,
+    QDRANT_SEARCH_SECONDS,
+    QDRANT_UPSERT_SECONDS,
+    FLAT_INDEX_SEARCH_SECONDS,
+    FLAT_INDEX_APPEND_SECONDS,
+    DB_QUERY_SECONDS,
+    LLM_CALL_SECONDS,
+    LLM_TOKENS,
+    STAGE_ERRORS,
+]
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request into REQUEST_SECONDS by workspace and endpoint"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        labels = RequestLabels()
+        token = bind_request_labels(labels)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # The router stores the matched endpoint in the shared scope
+            endpoint = scope.get("endpoint")
+            handler = endpoint.__name__ if endpoint is not None else "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - started, labels.workspace, handler)
+            reset_request_labels(token)
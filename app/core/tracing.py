@@ -0,0 +1,274 @@
+"""Lightweight per-request timing spans.
+
+Every HTTP request gets a Trace; code marks stages with ``with span("embed"):``.
+Stage totals are returned in a Server-Timing header, whole traces can be
+exported as OTLP JSON (to a JSON lines file or a local collector), and traces
+slower than a threshold are logged as a span tree.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "qna-support-retriever"
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+
+
+class SpanRecord:
+    __slots__ = ("name", "parent", "started", "ended")
+
+    def __init__(self, name: str, parent: Optional[int], started: float):
+        self.name = name
+        self.parent = parent
+        self.started = started
+        self.ended: Optional[float] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.ended or time.perf_counter()) - self.started) * 1000
+
+
+class Trace:
+    def __init__(self, name: str = "request"):
+        self.name = name
+        self.trace_id = os.urandom(16).hex()
+        self.wall_started_ns = time.time_ns()
+        self.started = time.perf_counter()
+        self.ended: Optional[float] = None
+        self.spans: List[SpanRecord] = []
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.ended or time.perf_counter()) - self.started) * 1000
+
+    def finish(self):
+        self.ended = time.perf_counter()
+
+    def server_timing(self) -> str:
+        """Stage durations summed by name, in first-seen order, plus the total"""
+        totals: Dict[str, float] = {}
+        for record in self.spans:
+            totals[record.name] = totals.get(record.name, 0.0) + record.duration_ms
+        entries = [f"{name};dur={duration:.1f}" for name, duration in totals.items()]
+        entries.append(f"total;dur={self.duration_ms:.1f}")
+        return ", ".join(entries)
+
+    def format_tree(self) -> str:
+        children: Dict[Optional[int], List[int]] = {}
+        for index, record in enumerate(self.spans):
+            children.setdefault(record.parent, []).append(index)
+
+        lines = [f"{self.name} {self.duration_ms:.1f}ms trace_id={self.trace_id}"]
+
+        def walk(parent: Optional[int], depth: int):
+            for index in children.get(parent, []):
+                record = self.spans[index]
+                offset = (record.started - self.started) * 1000
+                lines.append(f"{'  ' * depth}{record.name} {record.duration_ms:.1f}ms (+{offset:.1f}ms)")
+                walk(index, depth + 1)
+
+        walk(None, 1)
+        return "\n".join(lines)
+
+    def to_otlp_spans(self) -> List[dict]:
+        def to_ns(perf: float) -> str:
+            return str(self.wall_started_ns + int((perf - self.started) * 1e9))
+
+        root_id = os.urandom(8).hex()
+        span_ids = [os.urandom(8).hex() for _ in self.spans]
+        spans = [{
+            "traceId": self.trace_id,
+            "spanId": root_id,
+            "name": self.name,
+            "kind": SPAN_KIND_SERVER,
+            "startTimeUnixNano": str(self.wall_started_ns),
+            "endTimeUnixNano": to_ns(self.ended or time.perf_counter()),
+        }]
+        for record, span_id in zip(self.spans, span_ids):
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": span_id,
+                "parentSpanId": root_id if record.parent is None else span_ids[record.parent],
+                "name": record.name,
+                "kind": SPAN_KIND_INTERNAL,
+                "startTimeUnixNano": to_ns(record.started),
+                "endTimeUnixNano": to_ns(record.ended or record.started),
+            })
+        return spans
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+# Index of the enclosing span; a ContextVar so concurrent tasks nest correctly
+_current_span: ContextVar[Optional[int]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str):
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    record = SpanRecord(name, _current_span.get(), time.perf_counter())
+    trace.spans.append(record)
+    token = _current_span.set(len(trace.spans) - 1)
+    try:
+        yield
+    finally:
+        record.ended = time.perf_counter()
+        _current_span.reset(token)
+
+
+def otlp_payload(traces: List[Trace]) -> dict:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": __name__},
+                "spans": [otlp_span for trace in traces for otlp_span in trace.to_otlp_spans()]
+            }]
+        }]
+    }
+
+
+class SpanExporter(ABC):
+    """Buffers finished traces and ships them from a background task every flush interval"""
+
+    def __init__(self, flush_interval_seconds: float = 1.0, max_buffered: int = 10000):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_buffered = max_buffered
+        self._buffer: List[Trace] = []
+        self._task: Optional[asyncio.Task] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, trace: Trace):
+        if len(self._buffer) >= self.max_buffered:
+            self.dropped += 1
+            return
+        self._buffer.append(trace)
+
+    @abstractmethod
+    async def _ship(self, payload: dict):
+        ...
+
+    async def flush(self):
+        if not self._buffer:
+            return
+        traces, self._buffer = self._buffer, []
+        try:
+            await self._ship(otlp_payload(traces))
+            self.exported += len(traces)
+        except Exception as e:
+            self.dropped += len(traces)
+            logger.warning("Span export failed: %s", e)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+class JsonlSpanExporter(SpanExporter):
+    """One OTLP JSON payload per line, the format of the OpenTelemetry Collector file exporter"""
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+
+    def _write(self, line: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    async def _ship(self, payload: dict):
+        await asyncio.to_thread(self._write, json.dumps(payload, separators=(",", ":")))
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """OTLP/HTTP JSON to a collector, e.g. http://localhost:4318/v1/traces"""
+
+    def __init__(self, endpoint: str, **kwargs):
+        super().__init__(**kwargs)
+        self.endpoint = endpoint
+        self.client = httpx.AsyncClient(timeout=5.0)
+
+    async def _ship(self, payload: dict):
+        response = await self.client.post(self.endpoint, json=payload)
+        response.raise_for_status()
+
+    async def close(self):
+        await super().close()
+        await self.client.aclose()
+
+
+def create_span_exporter(kind: str, jsonl_path: str, otlp_endpoint: str) -> Optional[SpanExporter]:
+    if kind == "none":
+        return None
+    if kind == "jsonl":
+        return JsonlSpanExporter(jsonl_path)
+    if kind == "otlp":
+        return OtlpHttpSpanExporter(otlp_endpoint)
+    raise ValueError(f"Unknown span exporter: {kind}")
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: one Trace per HTTP request, Server-Timing header, export and slow-request logging"""
+
+    def __init__(self, app, exporter: Optional[SpanExporter] = None, slow_request_ms: Optional[float] = None):
+        self.app = app
+        self.exporter = exporter
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace(f"{scope['method']} {scope['path']}")
+        token = _current_trace.set(trace)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", trace.server_timing().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            trace.finish()
+            _current_trace.reset(token)
+            endpoint = scope.get("endpoint")
+            if endpoint is not None:
+                trace.name = f"{trace.name} {endpoint.__name__}"
+            if self.exporter is not None:
+                self.exporter.export(trace)
+            if self.slow_request_ms is not None and trace.duration_ms >= self.slow_request_ms:
+                logger.warning("Slow request\n%s", trace.format_tree())
@@ -1,32 +1,58 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
 from contextlib import asynccontextmanager
 
+from fastapi import FastAPI, HTTPException
+
 from app.core.config import get_config
-from app.core.database import engine
+from app.core.database import engine, ensure_question_hash_column
 from app.core.exceptions import QnAException
+from app.core.metrics import MetricsMiddleware
+from app.core.tracing import TracingMiddleware, create_span_exporter
 from app.core.error_handlers import (
     qna_exception_handler,
     http_exception_handler,
     general_exception_handler
 )
 from app.models.database import BaseModel
-from app.api.qa_routes import router as qa_router
+from app.api.qa_routes import router as qa_router, qdrant_registry, embedding_batcher, embedding_cache, ingestion_pool, llm_client, warm_up
 from app.api.health_routes import router as health_router
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
-    BaseModel.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(BaseModel.metadata.create_all)
+    # create_all does not add columns to tables created by older versions
+    await ensure_question_hash_column()
+    warm_up_task = asyncio.create_task(warm_up())
+    if config.ingestion_mode == "async":
+        ingestion_pool.start()
+    if span_exporter is not None:
+        span_exporter.start()
     yield
+    warm_up_task.cancel()
+    await ingestion_pool.stop()
+    await embedding_batcher.close()
+    await embedding_cache.close()
+    await qdrant_registry.close()
+    await llm_client.close()
+    if span_exporter is not None:
+        await span_exporter.close()
+    await engine.dispose()
 
 
 config = get_config()
 
+span_exporter = create_span_exporter(config.tracing_exporter, config.tracing_jsonl_path, config.tracing_otlp_endpoint)
+
 app = FastAPI(
     title="QnA-Support-Retriever",
     lifespan=lifespan
 )
 
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware, exporter=span_exporter, slow_request_ms=config.tracing_slow_request_ms)
+
 app.add_exception_handler(QnAException, qna_exception_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
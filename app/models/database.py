@@ -1,6 +1,7 @@
 from datetime import datetime
+from uuid import uuid4
 
-from sqlalchemy import Column, Integer, Text, DateTime, JSON, String, Index
+from sqlalchemy import Column, Integer, Text, DateTime, JSON, String, Index, LargeBinary
 from sqlalchemy.orm import declarative_base
 
 BaseModel = declarative_base()
@@ -13,10 +14,59 @@ class QAModel(BaseModel):
     workspace_id = Column(String(50), nullable=False, index=True)
     ticket_id = Column(Integer, nullable=False)
     question = Column(Text, nullable=False)
+    question_hash = Column(String(64), nullable=True)
     answer = Column(Text, nullable=False)
     created_at = Column(DateTime, default=datetime.now)
     source = Column(JSON, nullable=True)
     
     __table_args__ = (
         Index('ix_workspace_ticket', 'workspace_id', 'ticket_id'),
+        Index('ix_workspace_question_hash', 'workspace_id', 'question_hash'),
     )
+
+
+class IngestionJobModel(BaseModel):
+    __tablename__ = "ingestion_jobs"
+    
+    id = Column(String(32), primary_key=True, default=lambda: uuid4().hex)
+    workspace_id = Column(String(50), nullable=False)
+    ticket_id = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    stage = Column(String(20), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.now)
+    locked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    __table_args__ = (
+        Index('ix_ingestion_jobs_status_next_attempt', 'status', 'next_attempt_at'),
+        Index('ix_ingestion_jobs_workspace_ticket', 'workspace_id', 'ticket_id'),
+    )
+
+
+class DialogFingerprintModel(BaseModel):
+    __tablename__ = "dialog_fingerprints"
+    
+    id = Column(Integer, primary_key=True)
+    workspace_id = Column(String(50), nullable=False, index=True)
+    ticket_id = Column(Integer, nullable=False)
+    signature = Column(LargeBinary, nullable=False)
+    question = Column(Text, nullable=True)
+    answer = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+
+
+class ExtractionCacheModel(BaseModel):
+    __tablename__ = "extraction_cache"
+    
+    key = Column(String(64), primary_key=True)
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(64), nullable=False, index=True)
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=datetime.now)
+    expires_at = Column(DateTime, nullable=False, index=True)
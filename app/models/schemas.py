@@ -1,4 +1,4 @@
-from typing import List, Literal, Optional
+from typing import Dict, List, Literal, Optional
 from enum import Enum
 from datetime import datetime
 
@@ -28,12 +28,29 @@ class SaveQABody(BaseModel):
 
 
 class SaneQAResponse(BaseModel):
-    status: Literal["success", "error"] = Field(..., description="Operation status")
+    status: Literal["success", "error", "queued"] = Field(..., description="Operation status")
     message: Optional[str] = Field(None, description="Result message")
     extracted_question: Optional[str] = Field(None, description="Extracted question")
     extracted_answer: Optional[str] = Field(None, description="Extracted answer")
     ticket_id: Optional[int] = Field(None, description="Ticket ID")
     already_saved: bool = Field(default=False, description="Indicator that the ticket has already been saved")
+    job_id: Optional[str] = Field(None, description="Ingestion job ID when the save was queued")
+    timestamp: datetime = Field(default_factory=datetime.now, description="Processing time")
+
+
+class SaveQABatchBody(BaseModel):
+    items: List[SaveQABody] = Field(..., min_length=1, max_length=500, description="Tickets to save")
+
+
+class SaveQABatchResponse(BaseModel):
+    results: List[SaneQAResponse] = Field(..., description="Per-ticket results")
+    total: int = Field(..., ge=0, description="Number of distinct tickets processed")
+    saved: int = Field(..., ge=0, description="Newly saved Q&A pairs")
+    already_saved: int = Field(..., ge=0, description="Tickets that were already saved")
+    no_qa: int = Field(..., ge=0, description="Tickets without an extractable Q&A pair")
+    failed: int = Field(..., ge=0, description="Tickets whose extraction failed")
+    elapsed_seconds: float = Field(..., ge=0.0, description="Batch processing time")
+    tickets_per_second: float = Field(..., ge=0.0, description="Batch throughput")
     timestamp: datetime = Field(default_factory=datetime.now, description="Processing time")
 
 
@@ -48,6 +65,18 @@ class GetAnswerBody(BaseModel):
         return v.strip()
 
 
+class GetAnswerBatchBody(BaseModel):
+    questions: List[str] = Field(..., min_length=1, max_length=20, description="Questions to search for")
+    top_k: int = Field(default=5, ge=1, le=20, description="Number of results per question")
+    
+    @validator('questions', each_item=True)
+    def validate_question(cls, v):
+        v = v.strip()
+        if len(v) < 3 or len(v) > 1000:
+            raise ValueError('Question must be between 3 and 1000 characters')
+        return v
+
+
 class GetAnswerResultResponse(BaseModel):
     question: str = Field(..., description="Found question")
     answer: str = Field(..., description="Corresponding answer")
@@ -65,12 +94,36 @@ class GetAnswerResponse(BaseModel):
     timestamp: datetime = Field(default_factory=datetime.now, description="Processing time")
 
 
+class IngestionJobResponse(BaseModel):
+    job_id: str = Field(..., description="Ingestion job ID")
+    ticket_id: int = Field(..., description="Ticket ID")
+    status: Literal["pending", "processing", "completed", "failed"] = Field(..., description="Job status")
+    stage: Optional[str] = Field(None, description="Pipeline stage currently running")
+    attempts: int = Field(..., ge=0, description="Number of processing attempts so far")
+    max_attempts: int = Field(..., ge=1, description="Attempts allowed before the job fails")
+    last_error: Optional[str] = Field(None, description="Error from the latest failed attempt")
+    result: Optional[SaneQAResponse] = Field(None, description="Save result once the job has completed")
+    created_at: datetime = Field(..., description="Enqueue time")
+    updated_at: datetime = Field(..., description="Last status change")
+
+
+class GetAnswerBatchResponse(BaseModel):
+    results: List[GetAnswerResponse] = Field(..., description="Search results per question, in request order")
+    timestamp: datetime = Field(default_factory=datetime.now, description="Processing time")
+
+
 class HealthCheckResponse(BaseModel):
     status: str = Field(..., description="Service status")
     timestamp: datetime = Field(default_factory=datetime.now, description="Check time")
     version: str = Field(default="0.1.0", description="Service version")
 
 
+class ReadinessResponse(BaseModel):
+    status: Literal["ready", "not_ready"] = Field(..., description="Whether the service can take traffic")
+    components: Dict[str, str] = Field(..., description="Status of each dependency: ok, loading or an error message")
+    timestamp: datetime = Field(default_factory=datetime.now, description="Check time")
+
+
 class AuthErrorResponse(BaseModel):
     detail: str = Field(..., description="Error message")
     timestamp: datetime = Field(default_factory=datetime.now, description="Error time")
\ No newline at end of file
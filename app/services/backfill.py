@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+
+from app.core.database import get_db_context
+from app.core.metrics import EMBED_SECONDS, RequestLabels, bind_request_labels, reset_request_labels
+from app.core.exceptions import DatabaseException, EmbeddingException, LLMException, VectorStoreException
+from app.models.schemas import SaveQABody, SaneQAResponse
+from app.services.dialog import build_dialog_text
+from app.services.dialog_compaction import DialogCompactor
+from app.services.embeddings import Embedder
+from app.services.extraction_cache import ExtractionCache
+from app.services.llm_client import OpenAIClient
+from app.services.near_duplicates import NearDuplicateDetector
+from app.services.prefilter import DialogPrefilter
+from app.services.qa_service import get_qa, save_qa_bulk
+from app.services.qdrant import QdrantRegistry, build_point_payload
+
+
+logger = logging.getLogger(__name__)
+
+NO_QA_MESSAGE = "No high-quality Q&A pair found in dialog. Dialog may not contain business-relevant questions or clear answers."
+
+
+@dataclass
+class BackfillBatchResult:
+    results: List[SaneQAResponse] = field(default_factory=list)
+    saved: int = 0
+    already_saved: int = 0
+    no_qa: int = 0
+    failed: int = 0
+    failed_ticket_ids: List[int] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return len(self.results)
+
+    @property
+    def tickets_per_second(self) -> float:
+        return self.total / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
+class BackfillRunner:
+    """Saves many tickets at once: bounded-concurrency extraction, one encode, batched writes"""
+
+    def __init__(
+        self,
+        llm_client: OpenAIClient,
+        embedder: Embedder,
+        qdrant_registry: QdrantRegistry,
+        llm_concurrency: int = 8,
+        upsert_batch_size: int = 256,
+        near_duplicates: Optional[NearDuplicateDetector] = None,
+        extraction_cache: Optional[ExtractionCache] = None,
+        dialog_compactor: Optional[DialogCompactor] = None,
+        prefilter: Optional[DialogPrefilter] = None
+    ):
+        self.llm_client = llm_client
+        self.embedder = embedder
+        self.qdrant_registry = qdrant_registry
+        self.llm_concurrency = llm_concurrency
+        self.upsert_batch_size = upsert_batch_size
+        self.near_duplicates = near_duplicates
+        self.extraction_cache = extraction_cache
+        self.dialog_compactor = dialog_compactor
+        self.prefilter = prefilter
+
+    async def _extract(self, semaphore: asyncio.Semaphore, workspace_id: str, item: SaveQABody, dialog_text: str, signature):
+        """Returns (qa_result, reused); reused results come from a near-duplicate dialog instead of the LLM.
+
+        Raises LLMException when the provider call failed, so the ticket counts as failed rather than no_qa.
+        """
+        if signature is not None:
+            duplicate = await self.near_duplicates.find(workspace_id, signature)
+            if duplicate is not None:
+                qa_result = {"question": duplicate.question, "answer": duplicate.answer} if duplicate.question else None
+                return qa_result, True
+
+        decision = None
+        if self.prefilter is not None:
+            decision = await self.prefilter.evaluate(workspace_id, item.ticket_id, item.dialog)
+            if not decision.accepted and self.prefilter.blocks_extraction:
+                return None, False
+
+        async def call_llm(text: str):
+            async with semaphore:
+                return await self.llm_client.extract_qa_pair_with_status(text)
+
+        if self.extraction_cache is not None:
+            qa_result, api_failed = await self.extraction_cache.get_or_extract(dialog_text, call_llm)
+        else:
+            qa_result, api_failed = await call_llm(dialog_text)
+        # An empty result from a failed API call says nothing about the dialog
+        if decision is not None and not api_failed:
+            self.prefilter.record_outcome(workspace_id, item.ticket_id, decision, bool(qa_result))
+        if not qa_result and not api_failed and signature is not None:
+            await self.near_duplicates.record(workspace_id, item.ticket_id, signature, None, None)
+        if not qa_result and api_failed:
+            raise LLMException("LLM provider request failed")
+        return qa_result, False
+
+    async def run_batch(self, workspace_id: str, items: List[SaveQABody]) -> BackfillBatchResult:
+        token = bind_request_labels(RequestLabels(workspace_id))
+        try:
+            return await self._run_batch(workspace_id, items)
+        finally:
+            reset_request_labels(token)
+
+    async def _run_batch(self, workspace_id: str, items: List[SaveQABody]) -> BackfillBatchResult:
+        started = time.perf_counter()
+        result = BackfillBatchResult()
+
+        # Later duplicates of a ticket win, matching what sequential saves would store
+        unique_items = list({item.ticket_id: item for item in items}.values())
+
+        try:
+            async with get_db_context() as db:
+                existing = await get_qa(db, workspace_id, [item.ticket_id for item in unique_items])
+        except Exception as e:
+            raise DatabaseException(f"Error checking existing tickets: {str(e)}")
+
+        existing_by_ticket = {qa.ticket_id: qa for qa in existing}
+        pending = []
+        for item in unique_items:
+            qa = existing_by_ticket.get(item.ticket_id)
+            if qa is None:
+                pending.append(item)
+                continue
+            result.already_saved += 1
+            result.results.append(SaneQAResponse(
+                status="success",
+                message="Ticket already saved",
+                extracted_question=qa.question,
+                extracted_answer=qa.answer,
+                ticket_id=int(qa.ticket_id),
+                already_saved=True
+            ))
+
+        if self.dialog_compactor is not None:
+            # One worker thread for the whole batch keeps tokenizing off the event loop
+            dialog_texts = await asyncio.to_thread(
+                lambda: [self.dialog_compactor.compact(item.dialog).text for item in pending]
+            )
+        else:
+            dialog_texts = [build_dialog_text(item.dialog) for item in pending]
+        signatures = [
+            self.near_duplicates.signature(dialog_text) if self.near_duplicates else None
+            for dialog_text in dialog_texts
+        ]
+        semaphore = asyncio.Semaphore(self.llm_concurrency)
+        extractions = await asyncio.gather(
+            *(
+                self._extract(semaphore, workspace_id, item, dialog_text, signature)
+                for item, dialog_text, signature in zip(pending, dialog_texts, signatures)
+            ),
+            return_exceptions=True
+        )
+
+        extracted = []
+        extracted_signatures = {}
+        for item, signature, extraction in zip(pending, signatures, extractions):
+            if isinstance(extraction, Exception):
+                logger.error("Extraction failed for ticket %s: %s", item.ticket_id, extraction)
+                result.failed += 1
+                result.failed_ticket_ids.append(item.ticket_id)
+                result.results.append(SaneQAResponse(
+                    status="error",
+                    message=f"Extraction failed: {extraction}",
+                    ticket_id=item.ticket_id
+                ))
+                continue
+
+            qa_result, reused = extraction
+            if not qa_result:
+                result.no_qa += 1
+                result.results.append(SaneQAResponse(status="error", message=NO_QA_MESSAGE, ticket_id=item.ticket_id))
+            else:
+                extracted.append((item, qa_result))
+                if signature is not None and not reused:
+                    extracted_signatures[item.ticket_id] = signature
+
+        if extracted:
+            try:
+                embed_started = time.perf_counter()
+                vectors = await self.embedder.aencode([qa_result["question"] for _, qa_result in extracted])
+                EMBED_SECONDS.observe(time.perf_counter() - embed_started, workspace_id)
+            except Exception as e:
+                raise EmbeddingException(f"Error creating embeddings: {str(e)}")
+
+            created_at = datetime.now()
+            try:
+                qdrant_helper = await self.qdrant_registry.get(workspace_id)
+                await qdrant_helper.add_vectors(
+                    vectors,
+                    [
+                        build_point_payload(item.ticket_id, qa_result["question"], qa_result["answer"], created_at)
+                        for item, qa_result in extracted
+                    ],
+                    batch_size=self.upsert_batch_size
+                )
+            except Exception as e:
+                raise VectorStoreException(f"Error saving to vector store: {str(e)}")
+
+            try:
+                async with get_db_context() as db:
+                    await save_qa_bulk(db, workspace_id, [
+                        {
+                            "ticket_id": item.ticket_id,
+                            "question": qa_result["question"],
+                            "answer": qa_result["answer"],
+                            "source": item.model_dump(),
+                            "created_at": created_at
+                        }
+                        for item, qa_result in extracted
+                    ])
+            except Exception as e:
+                raise DatabaseException(f"Error saving to database: {str(e)}")
+
+            for item, qa_result in extracted:
+                signature = extracted_signatures.get(item.ticket_id)
+                if signature is not None:
+                    await self.near_duplicates.record(
+                        workspace_id, item.ticket_id, signature, qa_result["question"], qa_result["answer"]
+                    )
+                result.saved += 1
+                result.results.append(SaneQAResponse(
+                    status="success",
+                    message="QA pair successfully saved",
+                    extracted_question=qa_result["question"],
+                    extracted_answer=qa_result["answer"],
+                    ticket_id=item.ticket_id,
+                    already_saved=False
+                ))
+
+        result.elapsed_seconds = time.perf_counter() - started
+        return result
@@ -0,0 +1,11 @@
+from typing import List
+
+from app.models.schemas import Dialog, RoleType
+
+
+def format_message(role: RoleType, content: str) -> str:
+    return ("USER" if role == RoleType.USER else "SUPPORT") + ": " + content
+
+
+def build_dialog_text(dialog: List[Dialog]) -> str:
+    return "\n".join([format_message(msg.role, msg.content) for msg in dialog])
@@ -0,0 +1,208 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+from app.models.schemas import Dialog, RoleType
+from app.services.dialog import format_message
+
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = " [...]"
+
+# Messages that would be cut below this many tokens are dropped instead
+MIN_TRUNCATED_TOKENS = 32
+
+# A line this long that occurs in two or more messages is treated as boilerplate
+MIN_BOILERPLATE_LINE_LENGTH = 20
+
+# A sign-off followed by more than this many lines (itself included) is part of the message
+MAX_SIGNATURE_LINES = 4
+
+# Everything from a reply header on is the quoted previous message
+_QUOTE_HEADER_RE = re.compile(
+    r"^\s*("
+    r"-{2,}\s*(original message|исходное сообщение|forwarded message|пересылаемое сообщение)\s*-{2,}"
+    r"|on .{1,200} wrote:"
+    r"|.{1,200} (пишет|написал|написала):"
+    r"|from: .+"
+    r"|от: .+"
+    r")\s*$",
+    re.IGNORECASE
+)
+
+# Everything from a sign-off near the end of a message on is the signature
+_SIGNATURE_RE = re.compile(
+    r"^\s*("
+    r"--\s*"
+    r"|(best|kind|warm)? ?regards,?"
+    r"|thanks( and regards)?,?"
+    r"|sent from my .+"
+    r"|с уважением,?.*"
+    r"|отправлено с .+"
+    r")\s*$",
+    re.IGNORECASE
+)
+
+
+def _approximate_token_count(text: str) -> int:
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def load_token_counter(model: str) -> Callable[[str], int]:
+    """tiktoken encoder for the model when available, otherwise a word/punctuation approximation"""
+    try:
+        import tiktoken
+    except ImportError:
+        logger.warning("tiktoken is not installed, dialog token counts are approximate")
+        return _approximate_token_count
+
+    # Loading an encoding may download its BPE file
+    try:
+        try:
+            encoding = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken encoding failed to load, dialog token counts are approximate: %s", e)
+        return _approximate_token_count
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def strip_quotes_and_signature(content: str) -> str:
+    # Nothing is cut at the first line: "Thanks, ..." or "Иван написал:" there starts the message itself
+    lines = content.rstrip().splitlines()
+    for index in range(1, len(lines)):
+        if _QUOTE_HEADER_RE.match(lines[index]):
+            lines = lines[:index]
+            break
+    while lines and not lines[-1].strip():
+        lines.pop()
+    for index in range(max(1, len(lines) - MAX_SIGNATURE_LINES), len(lines)):
+        if _SIGNATURE_RE.match(lines[index]):
+            lines = lines[:index]
+            break
+    return "\n".join(line.rstrip() for line in lines if not line.lstrip().startswith(">")).strip()
+
+
+def drop_repeated_lines(contents: List[str]) -> List[str]:
+    """Remove long lines already seen in an earlier message, like auto-greetings and legal footers"""
+    seen = set()
+    result = []
+    for content in contents:
+        lines = []
+        for line in content.splitlines():
+            key = line.strip().lower()
+            if len(key) >= MIN_BOILERPLATE_LINE_LENGTH:
+                if key in seen:
+                    continue
+                seen.add(key)
+            lines.append(line)
+        result.append("\n".join(lines).strip())
+    return result
+
+
+@dataclass
+class CompactedDialog:
+    text: str
+    tokens_before: int
+    tokens_after: int
+    messages_dropped: int
+    messages_truncated: int
+
+
+class DialogCompactor:
+    """Cleans a dialog and fits it into a token budget before it is put into a prompt.
+
+    Quoted replies, signatures and boilerplate repeated across messages are
+    removed first. If the dialog is still over budget, messages are kept in
+    priority order - the user turns before the first support reply, then the
+    support replies, then the remaining user turns - and the message that
+    crosses the budget is truncated. Kept messages stay in dialog order.
+    The tokenizer is loaded by load() or on the first count.
+    """
+
+    def __init__(self, model: str, token_budget: int = 3000, count_tokens: Optional[Callable[[str], int]] = None):
+        self.model = model
+        self.token_budget = token_budget
+        self._count_tokens = count_tokens
+        self.dialogs = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.over_budget = 0
+
+    def load(self):
+        if self._count_tokens is None:
+            self._count_tokens = load_token_counter(self.model)
+
+    def count_tokens(self, text: str) -> int:
+        if self._count_tokens is None:
+            self.load()
+        return self._count_tokens(text)
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        # Shrink by the measured token/char ratio until it fits
+        while text and self.count_tokens(text + TRUNCATION_MARKER) > max_tokens:
+            ratio = max_tokens / self.count_tokens(text + TRUNCATION_MARKER)
+            text = text[:max(0, min(len(text) - 1, int(len(text) * ratio)))]
+        return text.rstrip() + TRUNCATION_MARKER
+
+    def _priority(self, dialog: List[Dialog]) -> List[int]:
+        first_support = next((i for i, msg in enumerate(dialog) if msg.role == RoleType.SUPPORT), len(dialog))
+        opening = list(range(first_support))
+        support = [i for i, msg in enumerate(dialog) if msg.role == RoleType.SUPPORT]
+        rest = [i for i in range(first_support, len(dialog)) if dialog[i].role != RoleType.SUPPORT]
+        return opening + support + rest
+
+    def compact(self, dialog: List[Dialog]) -> CompactedDialog:
+        tokens_before = sum(self.count_tokens(format_message(msg.role, msg.content)) for msg in dialog)
+
+        contents = drop_repeated_lines([strip_quotes_and_signature(msg.content) for msg in dialog])
+        lines = [format_message(msg.role, content) if content else None for msg, content in zip(dialog, contents)]
+        tokens = [self.count_tokens(line) if line else 0 for line in lines]
+
+        kept: List[Optional[str]] = [None] * len(dialog)
+        remaining = self.token_budget
+        truncated = 0
+        for index in self._priority(dialog):
+            line = lines[index]
+            if line is None:
+                continue
+            # Count the separating newline as one token
+            if tokens[index] + 1 <= remaining:
+                kept[index] = line
+                remaining -= tokens[index] + 1
+            elif remaining - 1 >= MIN_TRUNCATED_TOKENS:
+                kept[index] = self._truncate(line, remaining - 1)
+                remaining = 0
+                truncated += 1
+
+        text = "\n".join(line for line in kept if line is not None)
+        tokens_after = self.count_tokens(text)
+
+        self.dialogs += 1
+        self.tokens_before += tokens_before
+        self.tokens_after += tokens_after
+        if sum(tokens) + len(dialog) > self.token_budget:
+            self.over_budget += 1
+
+        return CompactedDialog(
+            text=text,
+            tokens_before=tokens_before,
+            tokens_after=tokens_after,
+            messages_dropped=sum(1 for line, original in zip(kept, lines) if line is None and original is not None),
+            messages_truncated=truncated
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "token_budget": self.token_budget,
+            "dialogs": self.dialogs,
+            "over_budget": self.over_budget,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "avg_tokens_before": self.tokens_before / self.dialogs if self.dialogs else 0.0,
+            "avg_tokens_after": self.tokens_after / self.dialogs if self.dialogs else 0.0,
+            "token_reduction": 1 - self.tokens_after / self.tokens_before if self.tokens_before else 0.0,
+        }
@@ -0,0 +1,142 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.services.normalization import normalize_question
+
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping cost (key string, tuple, OrderedDict node)
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class RedisEmbeddingBackend:
+    """Shared vector store so several workers can reuse each other's embeddings"""
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "qa:embedding:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError("redis package is required for the shared embedding cache backend") from e
+        self.client = redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes):
+        await self.client.set(self.prefix + key, value, ex=self.ttl_seconds or None)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class EmbeddingCache:
+    """Bounded LRU cache of float32 query vectors with TTL and an optional shared backend"""
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: int = 86400,
+        shared_backend: Optional[RedisEmbeddingBackend] = None
+    ):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.shared_backend = shared_backend
+        self._entries: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, text: str) -> str:
+        raw = f"{self.model_name}\0{normalize_question(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _get_local(self, key: str) -> Optional[np.ndarray]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, vector = entry
+        if self.ttl_seconds and expires_at < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return vector
+
+    def _put_local(self, key: str, vector: np.ndarray):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, vector)
+        self._bytes += vector.nbytes + ENTRY_OVERHEAD_BYTES
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        _, vector = self._entries.pop(key)
+        self._bytes -= vector.nbytes + ENTRY_OVERHEAD_BYTES
+
+    async def get(self, text: str) -> Optional[np.ndarray]:
+        key = self.make_key(text)
+        vector = self._get_local(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+
+        if self.shared_backend is not None:
+            try:
+                raw = await self.shared_backend.get(key)
+            except Exception as e:
+                logger.warning("Shared embedding cache lookup failed: %s", e)
+                raw = None
+            if raw:
+                vector = np.frombuffer(raw, dtype=np.float32)
+                self._put_local(key, vector)
+                self.shared_hits += 1
+                return vector
+
+        self.misses += 1
+        return None
+
+    async def set(self, text: str, vector: np.ndarray):
+        key = self.make_key(text)
+        # Own copy: a row of a batch result would otherwise keep the whole batch matrix alive
+        vector = np.array(vector, dtype=np.float32, copy=True).reshape(-1)
+        vector.setflags(write=False)
+        self._put_local(key, vector)
+
+        if self.shared_backend is not None:
+            try:
+                await self.shared_backend.set(key, vector.tobytes())
+            except Exception as e:
+                logger.warning("Shared embedding cache write failed: %s", e)
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+        }
+
+    async def close(self):
+        if self.shared_backend is not None:
+            await self.shared_backend.close()
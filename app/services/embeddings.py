@@ -1,21 +1,220 @@
+import asyncio
+import contextvars
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional
 
-from sentence_transformers import SentenceTransformer
+from app.core.metrics import EMBED_SECONDS, STAGE_ERRORS, current_workspace
+from app.core.tracing import span
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx_int8")
+
+DEFAULT_ONNX_INT8_FILE_NAME = "onnx/model_qint8_avx2.onnx"
+
+
+def load_sentence_transformer(model_name: str, backend: str = "torch", onnx_file_name: Optional[str] = None) -> "SentenceTransformer":
+    """Load the model on the requested inference backend.
+
+    ONNX backends need the optional onnx extra (optimum + onnxruntime) and, for
+    onnx_int8, a quantized file produced by ``python -m app.cli.export_onnx``.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend == "onnx":
+        model_kwargs = {"file_name": onnx_file_name} if onnx_file_name else None
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs)
+    if backend == "onnx_int8":
+        return SentenceTransformer(
+            model_name,
+            backend="onnx",
+            model_kwargs={"file_name": onnx_file_name or DEFAULT_ONNX_INT8_FILE_NAME}
+        )
+    raise ValueError(f"Unknown embedding backend: {backend}. Available: {', '.join(EMBEDDING_BACKENDS)}")
 
 
 class Embedder:
     _instance = None
     _lock = threading.Lock()
 
-    def __new__(cls, model_name="sentence-transformers/all-MiniLM-L6-v2"):
+    def __new__(
+        cls,
+        model_name="sentence-transformers/all-MiniLM-L6-v2",
+        max_workers: int = 1,
+        backend: str = "torch",
+        onnx_file_name: Optional[str] = None
+    ):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super().__new__(cls)
-                    cls._instance.model = SentenceTransformer(model_name)
+                    cls._instance.model_name = model_name
+                    cls._instance.backend = backend
+                    cls._instance.onnx_file_name = onnx_file_name
+                    cls._instance.model = None
+                    cls._instance.load_error = None
+                    cls._instance._model_lock = threading.Lock()
+                    cls._instance.executor = ThreadPoolExecutor(
+                        max_workers=max_workers,
+                        thread_name_prefix="embedder"
+                    )
         return cls._instance
 
+    @property
+    def is_loaded(self) -> bool:
+        return self.model is not None
+
+    def load(self):
+        """Import the inference stack and load the model; the first caller loads, others wait"""
+        if self.model is not None:
+            return self.model
+        with self._model_lock:
+            if self.model is None:
+                try:
+                    model = load_sentence_transformer(self.model_name, self.backend, self.onnx_file_name)
+                    # Run one forward pass so lazy backend initialisation is not paid by the first request
+                    model.encode("warmup", normalize_embeddings=True)
+                except Exception as e:
+                    self.load_error = str(e)
+                    raise
+                self.load_error = None
+                self.model = model
+        return self.model
+
+    async def aload(self):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.load)
+
+    @property
+    def cache_key(self) -> str:
+        """Identifies the vector space; backends differ slightly numerically"""
+        return f"{self.model_name}:{self.backend}"
+
     def encode(self, texts, convert_to_numpy=True):
-        embeddings = self.model.encode(texts, convert_to_numpy=convert_to_numpy, normalize_embeddings=True)
+        embeddings = self.load().encode(texts, convert_to_numpy=convert_to_numpy, normalize_embeddings=True)
         return embeddings
 
+    async def aencode(self, texts, convert_to_numpy=True):
+        """Run encode on the bounded embedder executor so the event loop stays free"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.encode, texts, convert_to_numpy)
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent single-text encode calls into batched model.encode runs"""
+
+    def __init__(self, embedder: Embedder, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.embedder = embedder
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: asyncio.Queue | None = None
+        self._collector: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+        self._batches = 0
+        self._items = 0
+        self._total_queue_delay = 0.0
+        self._max_queue_delay = 0.0
+
+    def _ensure_collector(self):
+        """Start the collector, or restart it if it exited, on a fresh queue"""
+        if self._collector is None or self._collector.done():
+            self._queue = asyncio.Queue()
+            # A clean context, so batches are not labelled and traced as the request that happened to start it
+            self._collector = asyncio.create_task(self._collect(self._queue), context=contextvars.Context())
+
+    async def encode(self, text: str):
+        self._ensure_collector()
+        future = asyncio.get_running_loop().create_future()
+        enqueued = time.perf_counter()
+        self._queue.put_nowait((text, future, enqueued))
+        try:
+            with span("embed"):
+                return await future
+        except Exception:
+            STAGE_ERRORS.inc(current_workspace(), "embed")
+            raise
+        finally:
+            EMBED_SECONDS.observe(time.perf_counter() - enqueued, current_workspace())
+
+    async def _collect(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    if not queue.empty():
+                        batch.append(queue.get_nowait())
+                        continue
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                task = asyncio.create_task(self._run_batch(batch))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+                batch = []
+        except BaseException as e:
+            # Nothing will read this queue again; fail its callers instead of leaving them waiting
+            error = e if isinstance(e, Exception) else RuntimeError("Embedding batcher stopped")
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            raise
+
+    async def _run_batch(self, batch: list):
+        started = time.perf_counter()
+        for _, _, enqueued in batch:
+            delay = started - enqueued
+            self._total_queue_delay += delay
+            self._max_queue_delay = max(self._max_queue_delay, delay)
+        self._batches += 1
+        self._items += len(batch)
+
+        try:
+            embeddings = await self.embedder.aencode([text for text, _, _ in batch])
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), row in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(row)
+
+    def get_stats(self) -> dict:
+        return {
+            "batches": self._batches,
+            "encoded_texts": self._items,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+            "avg_batch_fill": self._items / (self._batches * self.max_batch_size) if self._batches else 0.0,
+            "avg_queue_delay_ms": self._total_queue_delay / self._items * 1000 if self._items else 0.0,
+            "max_queue_delay_ms": self._max_queue_delay * 1000,
+        }
+
+    async def close(self):
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
@@ -0,0 +1,104 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+
+from app.core.database import get_db_context
+from app.models.database import ExtractionCacheModel
+
+
+logger = logging.getLogger(__name__)
+
+Extractor = Callable[[str], Awaitable[Tuple[Optional[Dict[str, Any]], bool]]]
+
+# Expired rows are deleted once every this many writes
+CLEANUP_EVERY_WRITES = 500
+
+
+class ExtractionCache:
+    """Persistent cache of LLM extraction outcomes, positive and negative.
+
+    Keyed by a hash of the dialog text, model name and prompt version, so a
+    prompt or model change never serves results produced by the old one.
+    """
+
+    def __init__(self, model: str, prompt_version: str, ttl_seconds: int = 30 * 86400):
+        self.model = model
+        self.prompt_version = prompt_version
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self._writes = 0
+
+    def make_key(self, dialog_text: str) -> str:
+        raw = f"{self.model}\0{self.prompt_version}\0{dialog_text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get_or_extract(self, dialog_text: str, extract: Extractor) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """(result, api_failed) like the extractor; cached outcomes never come from a failed call"""
+        key = self.make_key(dialog_text)
+        try:
+            async with get_db_context() as db:
+                entry = await db.get(ExtractionCacheModel, key)
+        except Exception as e:
+            logger.warning("Extraction cache lookup failed: %s", e)
+            entry = None
+
+        if entry is not None and entry.expires_at > datetime.now():
+            self.hits += 1
+            if entry.result is None:
+                self.negative_hits += 1
+            return entry.result, False
+
+        self.misses += 1
+        result, api_failed = await extract(dialog_text)
+        # A negative outcome caused by a failed API call says nothing about the dialog
+        if result is not None or not api_failed:
+            await self._store(key, result)
+        return result, api_failed
+
+    async def _store(self, key: str, result: Optional[Dict[str, Any]]):
+        now = datetime.now()
+        try:
+            async with get_db_context() as db:
+                await db.merge(ExtractionCacheModel(
+                    key=key,
+                    model=self.model,
+                    prompt_version=self.prompt_version,
+                    result=result,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds)
+                ))
+                self._writes += 1
+                if self._writes % CLEANUP_EVERY_WRITES == 0:
+                    await db.execute(delete(ExtractionCacheModel).where(ExtractionCacheModel.expires_at <= now))
+        except Exception as e:
+            logger.warning("Extraction cache write failed: %s", e)
+
+    async def purge(self, prompt_version: str) -> int:
+        async with get_db_context() as db:
+            result = await db.execute(
+                delete(ExtractionCacheModel).where(ExtractionCacheModel.prompt_version == prompt_version)
+            )
+        return result.rowcount
+
+    async def count_by_prompt_version(self) -> Dict[str, int]:
+        async with get_db_context() as db:
+            rows = await db.execute(
+                select(ExtractionCacheModel.prompt_version, func.count())
+                .group_by(ExtractionCacheModel.prompt_version)
+            )
+            return {prompt_version: count for prompt_version, count in rows}
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "prompt_version": self.prompt_version,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,270 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.metrics import FLAT_INDEX_APPEND_SECONDS, FLAT_INDEX_SEARCH_SECONDS, STAGE_ERRORS, current_workspace
+from app.core.tracing import span
+
+
+VECTOR_DTYPE = np.dtype("<f4")
+ID_DTYPE = np.dtype("<i8")
+
+# Rows reserved when the vectors file first grows; it doubles after that
+MIN_CAPACITY = 1024
+
+
+class FlatVectorIndex:
+    """Exact cosine search over one workspace's vectors in a memory-mapped file.
+
+    Same interface as QdrantHelper for the save and search paths. Three files
+    per workspace: ``vectors.f32`` holds normalized float32 rows and grows by
+    doubling, ``payloads.jsonl`` holds the question and answer of each row so
+    hits are lean like Qdrant payloads, and ``ids.i64`` holds the ticket id of
+    each row and is appended to last, so its length is the committed row
+    count. Re-adding a ticket appends a new row and masks the old one. Appends
+    run in a worker thread under an exclusive file lock, and every call first
+    picks up rows appended by other worker processes.
+    """
+
+    def __init__(self, path: str, collection_name: str, workspace_id: str = None, vector_size: int = 384):
+        self.base_collection_name = collection_name
+        self.workspace_id = workspace_id
+        self.collection_name = f"{workspace_id}_{collection_name}" if workspace_id else collection_name
+        self.directory = os.path.join(path, self.collection_name)
+        self.vector_size = vector_size
+        self._row_bytes = vector_size * VECTOR_DTYPE.itemsize
+        self._vectors_path = os.path.join(self.directory, "vectors.f32")
+        self._ids_path = os.path.join(self.directory, "ids.i64")
+        self._payloads_path = os.path.join(self.directory, "payloads.jsonl")
+        self._ids_fd: Optional[int] = None
+        self._payloads_fd: Optional[int] = None
+        self._payloads_offset = 0
+        # Question and answer by row; rows written before payloads.jsonl existed have none
+        self._texts: Dict[int, Tuple[str, str]] = {}
+        # flock is per open file, so threads of this process also need a lock of their own
+        self._append_lock = threading.Lock()
+        self._state_lock = threading.RLock()
+        self._vectors: Optional[np.memmap] = None
+        self._ids = np.empty(0, dtype=ID_DTYPE)
+        self._live = np.empty(0, dtype=bool)
+        self._dead = 0
+        self._row_by_id: Dict[int, int] = {}
+        self._count = 0
+
+    @property
+    def metrics_label(self) -> str:
+        return self.workspace_id or current_workspace()
+
+    @property
+    def count(self) -> int:
+        """Searchable vectors, not counting superseded rows"""
+        return self._count - self._dead
+
+    async def init_collection(self):
+        if self._ids_fd is not None:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            open(self._vectors_path, "ab").close()
+            self._payloads_fd = os.open(self._payloads_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            self._ids_fd = os.open(self._ids_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            self._refresh()
+        except Exception as e:
+            raise ValueError(f"Error initializing flat index: {e}")
+
+    def _map_vectors(self):
+        capacity = os.path.getsize(self._vectors_path) // self._row_bytes
+        if capacity == 0:
+            self._vectors = None
+        elif self._vectors is None or len(self._vectors) != capacity:
+            self._vectors = np.memmap(self._vectors_path, dtype=VECTOR_DTYPE, mode="r+", shape=(capacity, self.vector_size))
+
+    def _read_payloads(self):
+        """Read complete payload lines appended since the last call; a later line for a row wins"""
+        size = os.fstat(self._payloads_fd).st_size
+        if size <= self._payloads_offset:
+            return
+        data = os.pread(self._payloads_fd, size - self._payloads_offset, self._payloads_offset)
+        end = data.rfind(b"\n") + 1
+        for line in data[:end].splitlines():
+            payload = json.loads(line)
+            self._texts[payload["row"]] = (payload["question"], payload["answer"])
+        self._payloads_offset += end
+
+    def _refresh(self):
+        """Pick up rows committed since the last call, by this or another process"""
+        with self._state_lock:
+            self._refresh_locked()
+
+    def _refresh_locked(self):
+        count = os.fstat(self._ids_fd).st_size // ID_DTYPE.itemsize
+        if count == self._count:
+            return
+
+        # Payload lines are written before the ids that commit their rows
+        self._read_payloads()
+        new_ids = np.fromfile(self._ids_path, dtype=ID_DTYPE, count=count - self._count, offset=self._count * ID_DTYPE.itemsize)
+        live = np.ones(len(new_ids), dtype=bool)
+        for offset, ticket_id in enumerate(new_ids.tolist()):
+            row = self._count + offset
+            previous = self._row_by_id.get(ticket_id)
+            if previous is not None:
+                if previous < self._count:
+                    self._live[previous] = False
+                else:
+                    live[previous - self._count] = False
+                self._texts.pop(previous, None)
+                self._dead += 1
+            self._row_by_id[ticket_id] = row
+
+        self._ids = np.concatenate([self._ids, new_ids])
+        self._live = np.concatenate([self._live, live])
+        self._count = count
+        if self._vectors is None or len(self._vectors) < count:
+            self._map_vectors()
+
+    @contextmanager
+    def _write_lock(self):
+        with self._append_lock:
+            fcntl.flock(self._ids_fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._ids_fd, fcntl.LOCK_UN)
+
+    def _append(self, vectors: np.ndarray, payloads: List[Dict]):
+        """Blocking: waits on other processes' appends and syncs the mapping; run it in a thread"""
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+        with self._write_lock():
+            with self._state_lock:
+                self._refresh_locked()
+                start = self._count
+                needed = start + len(payloads)
+                capacity = len(self._vectors) if self._vectors is not None else 0
+                if needed > capacity:
+                    # Sparse growth; untouched pages take no disk space
+                    os.truncate(self._vectors_path, max(needed, 2 * capacity, MIN_CAPACITY) * self._row_bytes)
+                    self._map_vectors()
+                mapped = self._vectors
+            # Rows past the committed count are not read by searches, so no state lock from here
+            mapped[start:needed] = vectors
+            mapped.flush()
+            os.write(self._payloads_fd, "".join(
+                json.dumps({"row": start + offset, "question": payload.get("question"), "answer": payload.get("answer")}) + "\n"
+                for offset, payload in enumerate(payloads)
+            ).encode("utf-8"))
+            # The id write commits the rows
+            os.write(self._ids_fd, np.asarray([payload.get("ticket_id") for payload in payloads], dtype=ID_DTYPE).tobytes())
+            self._refresh()
+
+    def _search(self, queries: np.ndarray, top_k: int, score_threshold: float) -> List[List[Dict]]:
+        with self._state_lock:
+            self._refresh_locked()
+            return self._search_locked(queries, top_k, score_threshold)
+
+    def _search_locked(self, queries: np.ndarray, top_k: int, score_threshold: float) -> List[List[Dict]]:
+        if self._count == 0:
+            return [[] for _ in queries]
+
+        queries = queries.astype(np.float32, copy=False)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1.0, norms)
+        # One BLAS product over every row; superseded rows are masked out
+        scores = queries @ self._vectors[:self._count].T
+        if self._dead:
+            scores[:, ~self._live] = -np.inf
+        k = min(top_k, self._count)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        results = []
+        for row_scores, rows in zip(scores, top):
+            rows = rows[np.argsort(-row_scores[rows])]
+            hits = []
+            for row in rows.tolist():
+                if row_scores[row] < score_threshold:
+                    continue
+                question, answer = self._texts.get(row, (None, None))
+                hits.append({
+                    "ticket_id": int(self._ids[row]),
+                    "question": question,
+                    "answer": answer,
+                    "score": float(row_scores[row]),
+                    "is_lean": answer is not None
+                })
+            results.append(hits)
+        return results
+
+    async def add_vector(self, vector: np.ndarray, payload: Dict):
+        if vector.ndim == 1:
+            vector = vector[np.newaxis, :]
+        elif not (vector.ndim == 2 and vector.shape[0] == 1):
+            raise ValueError("Vector must be 1D or 2D with shape (1, N)")
+
+        await self.init_collection()
+        started = time.perf_counter()
+        try:
+            with span("vector_upsert"):
+                await asyncio.to_thread(self._append, vector, [payload])
+        except Exception as e:
+            STAGE_ERRORS.inc(self.metrics_label, "flat_append")
+            raise ValueError(f"Error adding vector: {e}")
+        finally:
+            FLAT_INDEX_APPEND_SECONDS.observe(time.perf_counter() - started, self.metrics_label)
+
+    async def add_vectors(self, vectors: np.ndarray, payloads: List[Dict], batch_size: int = 256):
+        """Append many vectors under one lock; batch_size is accepted for QdrantHelper compatibility"""
+        if vectors.ndim != 2 or vectors.shape[0] != len(payloads):
+            raise ValueError("vectors must be 2D with one row per payload")
+
+        await self.init_collection()
+        started = time.perf_counter()
+        try:
+            with span("vector_upsert"):
+                await asyncio.to_thread(self._append, vectors, payloads)
+        except Exception as e:
+            STAGE_ERRORS.inc(self.metrics_label, "flat_append")
+            raise ValueError(f"Error adding vectors: {e}")
+        finally:
+            FLAT_INDEX_APPEND_SECONDS.observe(time.perf_counter() - started, self.metrics_label)
+
+    async def search_similar(self, query_vector: np.ndarray, top_k: int = 5, score_threshold: float = 0.1) -> List[Dict]:
+        if query_vector.ndim == 1:
+            query_vector = query_vector[np.newaxis, :]
+        elif not (query_vector.ndim == 2 and query_vector.shape[0] == 1):
+            raise ValueError("query_vector must be 1D or 2D with shape (1, N)")
+
+        return (await self.search_similar_batch(query_vector, top_k, score_threshold))[0]
+
+    async def search_similar_batch(
+        self, query_vectors: np.ndarray, top_k: int = 5, score_threshold: float = 0.1
+    ) -> List[List[Dict]]:
+        if query_vectors.ndim != 2:
+            raise ValueError("query_vectors must be 2D with one row per query")
+
+        await self.init_collection()
+        started = time.perf_counter()
+        try:
+            with span("vector_search"):
+                return self._search(query_vectors, top_k, score_threshold)
+        except Exception as e:
+            STAGE_ERRORS.inc(self.metrics_label, "flat_search")
+            raise ValueError(f"Error searching vectors: {e}")
+        finally:
+            FLAT_INDEX_SEARCH_SECONDS.observe(time.perf_counter() - started, self.metrics_label)
+
+    def close(self):
+        self._vectors = None
+        for fd in (self._ids_fd, self._payloads_fd):
+            if fd is not None:
+                os.close(fd)
+        self._ids_fd = None
+        self._payloads_fd = None
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+
+from app.core.database import get_db_context
+from app.models.database import IngestionJobModel
+from app.services.job_service import JOB_COMPLETED, JOB_FAILED, JOB_PENDING, claim_next_job, update_job
+
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+JobProcessor = Callable[[IngestionJobModel, ProgressCallback], Awaitable[dict]]
+
+
+class IngestionWorkerPool:
+    """Background workers draining the SQL-backed ingestion job table"""
+
+    def __init__(
+        self,
+        process: JobProcessor,
+        concurrency: int = 4,
+        retry_delay_seconds: float = 30.0,
+        poll_interval_seconds: float = 1.0,
+        lock_timeout_seconds: float = 300.0
+    ):
+        self.process = process
+        self.concurrency = concurrency
+        self.retry_delay_seconds = retry_delay_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lock_timeout_seconds = lock_timeout_seconds
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self):
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._run(), name=f"ingestion-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+
+    def notify(self):
+        """Wake idle workers after a job was enqueued instead of waiting for the next poll"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _run(self):
+        while True:
+            try:
+                async with get_db_context() as db:
+                    job = await claim_next_job(db, self.lock_timeout_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Failed to claim ingestion job: %s", e)
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._handle(job)
+
+    async def _handle(self, job: IngestionJobModel):
+        async def progress(stage: str):
+            async with get_db_context() as db:
+                await update_job(db, job.id, stage=stage)
+
+        try:
+            result = await self.process(job, progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            message = getattr(e, "message", None) or str(e)
+            if job.attempts >= job.max_attempts:
+                logger.error("Ingestion job %s failed permanently: %s", job.id, message)
+                values = {"status": JOB_FAILED, "last_error": message, "locked_at": None}
+            else:
+                delay = self.retry_delay_seconds * 2 ** (job.attempts - 1)
+                logger.warning("Ingestion job %s failed, retrying in %.0fs: %s", job.id, delay, message)
+                values = {
+                    "status": JOB_PENDING,
+                    "last_error": message,
+                    "locked_at": None,
+                    "next_attempt_at": datetime.now() + timedelta(seconds=delay)
+                }
+        else:
+            values = {"status": JOB_COMPLETED, "stage": None, "result": result, "locked_at": None}
+
+        try:
+            async with get_db_context() as db:
+                await update_job(db, job.id, **values)
+        except Exception as e:
+            logger.error("Failed to record ingestion job %s outcome: %s", job.id, e)
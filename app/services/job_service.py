@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.database import IngestionJobModel
+
+
+JOB_PENDING = "pending"
+JOB_PROCESSING = "processing"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+ACTIVE_JOB_STATUSES = (JOB_PENDING, JOB_PROCESSING)
+
+
+async def create_job(
+    db: AsyncSession,
+    workspace_id: str,
+    ticket_id: int,
+    payload: dict,
+    max_attempts: int
+) -> IngestionJobModel:
+    job = IngestionJobModel(
+        workspace_id=workspace_id,
+        ticket_id=ticket_id,
+        payload=payload,
+        status=JOB_PENDING,
+        max_attempts=max_attempts
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_job(db: AsyncSession, workspace_id: str, job_id: str) -> Optional[IngestionJobModel]:
+    result = await db.execute(
+        select(IngestionJobModel).filter(
+            IngestionJobModel.workspace_id == workspace_id,
+            IngestionJobModel.id == job_id
+        )
+    )
+    return result.scalars().first()
+
+
+async def get_active_job_for_ticket(db: AsyncSession, workspace_id: str, ticket_id: int) -> Optional[IngestionJobModel]:
+    result = await db.execute(
+        select(IngestionJobModel).filter(
+            IngestionJobModel.workspace_id == workspace_id,
+            IngestionJobModel.ticket_id == ticket_id,
+            IngestionJobModel.status.in_(ACTIVE_JOB_STATUSES)
+        ).limit(1)
+    )
+    return result.scalars().first()
+
+
+async def claim_next_job(db: AsyncSession, lock_timeout_seconds: float) -> Optional[IngestionJobModel]:
+    """Atomically move the oldest due job to processing; stale processing jobs are reclaimed"""
+    now = datetime.now()
+    stale_before = now - timedelta(seconds=lock_timeout_seconds)
+    claimable = or_(
+        and_(IngestionJobModel.status == JOB_PENDING, IngestionJobModel.next_attempt_at <= now),
+        and_(IngestionJobModel.status == JOB_PROCESSING, IngestionJobModel.locked_at < stale_before)
+    )
+
+    result = await db.execute(
+        select(IngestionJobModel.id)
+        .filter(claimable)
+        .order_by(IngestionJobModel.next_attempt_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job_id = result.scalar()
+    if job_id is None:
+        return None
+
+    claimed = await db.execute(
+        update(IngestionJobModel)
+        .filter(IngestionJobModel.id == job_id, claimable)
+        .values(
+            status=JOB_PROCESSING,
+            attempts=IngestionJobModel.attempts + 1,
+            locked_at=now,
+            updated_at=now
+        )
+    )
+    await db.commit()
+    if claimed.rowcount != 1:
+        return None
+
+    return await db.get(IngestionJobModel, job_id, populate_existing=True)
+
+
+async def update_job(db: AsyncSession, job_id: str, **values):
+    await db.execute(
+        update(IngestionJobModel)
+        .filter(IngestionJobModel.id == job_id)
+        .values(updated_at=datetime.now(), **values)
+    )
+    await db.commit()
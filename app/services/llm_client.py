@@ -1,12 +1,24 @@
+import hashlib
 import json
+import logging
 import re
 import httpx
 import time
+from collections import deque
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from functools import cached_property
+from typing import Optional, Dict, Any, Tuple
 
 import openai
 
+from app.core.exceptions import LLMException
+from app.core.metrics import LLM_CALL_SECONDS, LLM_TOKENS, STAGE_ERRORS, current_workspace
+from app.core.tracing import span
+from app.services.llm_resilience import AdaptiveConcurrencyLimiter, CircuitBreaker, ResilientCaller
+
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class QuestionExtractionResult:
@@ -28,9 +40,60 @@ class QualityMetrics:
     token_count: int
     api_cost: float
 
+EXTRACTION_MODES = ("single", "two_step", "streaming")
+
+# Questions below this confidence are discarded by _build_validated_qa_pair
+MIN_QUESTION_CONFIDENCE = 0.5
+
+# "question" is the first key of QA_PAIR_RESPONSE_FORMAT, "confidence" the second
+_STREAM_QUESTION_RE = re.compile(r'^\s*\{\s*"question"\s*:\s*(null|"(?:[^"\\]|\\.)*")')
+_STREAM_CONFIDENCE_RE = re.compile(r'\s*,\s*"confidence"\s*:\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)\s*[,}]')
+
+# Last API error inside the current task, so callers can tell
+# "no Q&A pair in this dialog" apart from "the provider could not be reached"
+_api_error: ContextVar[Optional[Exception]] = ContextVar("llm_api_error", default=None)
+
+
+def _record_call_error(error: Exception):
+    """Only failures to reach the provider count as API errors; anything else is an unusable reply"""
+    if isinstance(error, (openai.OpenAIError, httpx.HTTPError, LLMException, TimeoutError)):
+        logger.warning("OpenAI API error: %s", error)
+        _api_error.set(error)
+    else:
+        logger.warning("Unusable LLM response: %s", error)
+
+
+QA_PAIR_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "qa_pair",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "question": {"type": ["string", "null"]},
+                "confidence": {"type": "number"},
+                "original_text": {"type": ["string", "null"]},
+                "position": {"type": ["integer", "null"]},
+                "answer": {"type": ["string", "null"]},
+                "relevance": {"type": "number"},
+                "answer_original_text": {"type": ["string", "null"]},
+                "support_message_id": {"type": ["integer", "null"]}
+            },
+            "required": [
+                "question", "confidence", "original_text", "position",
+                "answer", "relevance", "answer_original_text", "support_message_id"
+            ],
+            "additionalProperties": False
+        }
+    }
+}
+
+
 class BaseAIClient:
     def __init__(self):
-        self.quality_metrics = []
+        # Last 100 extractions
+        self.quality_metrics = deque(maxlen=100)
     
     def _build_optimized_question_prompt(self, dialog_text: str) -> str:
         """Enhanced English prompt for question extraction with JSON output"""
@@ -112,6 +175,52 @@ SUPPORT: "What specific issues are you having?"
 → {{"answer": null, "relevance": 0.0, "original_text": "What specific issues are you having?", "support_message_id": 2}}"""
         return prompt.strip()
     
+    def _build_combined_qa_prompt(self, dialog_text: str) -> str:
+        """Single prompt extracting the question and its answer in one JSON object"""
+        prompt = f"""INSTRUCTION: Extract the first genuine support question from this dialog and the direct answer to it from SUPPORT responses.
+
+Return the response in the language used by the support agent and the user.
+
+QUESTION CRITERIA:
+✓ Comes from a USER message
+✓ Contains question words (how, what, where, when, why, can, is, does)
+✓ Ends with "?" or implies seeking information/help
+✓ Related to technical support, product features, or troubleshooting
+✓ Excludes greetings, thanks, confirmations, and requests
+
+ANSWER CRITERIA:
+✓ Response from SUPPORT role only, after the question
+✓ Directly addresses the question with actionable information
+✓ Excludes follow-up questions, requests for clarification
+✓ Core answer only, pleasantries removed
+
+ALGORITHM:
+1. Read chronologically through USER messages, pick the first one meeting the question criteria
+2. Normalize it to a clear, concise question (max 20 words), assign confidence (0.0-1.0)
+3. Find the first SUPPORT response after it that answers it, assign relevance (0.0-1.0)
+4. Use null for the question when none qualifies and null for the answer when none qualifies
+
+INPUT DIALOG:
+{dialog_text}
+
+OUTPUT FORMAT (JSON only):
+{{
+  "question": "normalized question text or null",
+  "confidence": 0.95,
+  "original_text": "exact user input",
+  "position": 1,
+  "answer": "direct answer text or null",
+  "relevance": 0.85,
+  "answer_original_text": "full support response",
+  "support_message_id": 2
+}}
+
+EXAMPLE:
+USER: "Hello! How do I reset my password?"
+SUPPORT: "To reset your password, go to Settings → Security → Reset Password"
+→ {{"question": "How do I reset my password?", "confidence": 0.95, "original_text": "Hello! How do I reset my password?", "position": 1, "answer": "Go to Settings → Security → Reset Password", "relevance": 0.95, "answer_original_text": "To reset your password, go to Settings → Security → Reset Password", "support_message_id": 2}}"""
+        return prompt.strip()
+    
     def _validate_qa_pair(self, question: str, answer: str) -> Dict[str, Any]:
         """Validate extracted Q&A pair quality"""
         validation_result = {
@@ -252,17 +361,31 @@ class OpenAIClient(BaseAIClient):
         api_key: str, 
         model: str = "gpt-4o-mini",
         proxy_url: str = None,
-        enable_monitoring: bool = False
+        enable_monitoring: bool = False,
+        extraction_mode: str = "single",
+        resilience: Optional[ResilientCaller] = None,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16
     ):
         super().__init__()
-        self.client = openai.OpenAI(api_key=api_key)
-        if proxy_url:
-            self.client = openai.OpenAI(
-                api_key=api_key,
-                http_client=httpx.Client(proxy=proxy_url)
-            )
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        # One pooled HTTP client for every request; retries are done by ResilientCaller, not the SDK
+        self.http_client = httpx.AsyncClient(
+            proxy=proxy_url,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=60.0
+            ),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+        self.client = openai.AsyncOpenAI(api_key=api_key, http_client=self.http_client, max_retries=0)
+        self.resilience = resilience or ResilientCaller(AdaptiveConcurrencyLimiter(), CircuitBreaker())
         self.model = model
         self.enable_monitoring = enable_monitoring
+        self.extraction_mode = extraction_mode
+        self.streaming_stats = {"requests": 0, "early_stops": 0}
         self.default_config = {
             "temperature": 0.1,
             "top_p": 0.9,
@@ -271,19 +394,39 @@ class OpenAIClient(BaseAIClient):
             "response_format": {"type": "json_object"}
         }
 
-    def is_available(self) -> bool:
+    async def close(self):
+        await self.client.close()
+
+    async def _create_completion(self, stage: str, **kwargs):
+        workspace = current_workspace()
+        started = time.perf_counter()
+        try:
+            with span(stage):
+                response = await self.resilience.call(lambda: self.client.chat.completions.with_raw_response.create(**kwargs))
+        except Exception:
+            STAGE_ERRORS.inc(workspace, "llm")
+            raise
+        # Streams are timed by the caller once they are consumed
+        if not kwargs.get("stream"):
+            LLM_CALL_SECONDS.observe(time.perf_counter() - started, workspace)
+            if response.usage is not None:
+                LLM_TOKENS.inc(workspace, amount=response.usage.total_tokens)
+        return response
+
+    async def is_available(self) -> bool:
         try:
-            self.client.models.list()
+            await self.client.models.list()
             return True
         except Exception:
             return False
 
-    def extract_main_question(self, dialog_text: str, timeout: int = 30) -> Optional[QuestionExtractionResult]:
+    async def extract_main_question(self, dialog_text: str, timeout: int = 30) -> Optional[QuestionExtractionResult]:
         """Extract question with confidence scoring and structured output"""
         start_time = time.time()
         
         try:
-            response = self.client.chat.completions.create(
+            response = await self._create_completion(
+                "llm_question",
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert support dialog analyzer. Always respond with valid JSON."},
@@ -324,20 +467,18 @@ class OpenAIClient(BaseAIClient):
                     )
                 
         except Exception as e:
-            print(f"OpenAI API error: {e}")
+            _record_call_error(e)
             return None
                 
         return None
 
-    def extract_answer_for_question(self, question: str, dialog_text: str, timeout: int = 30) -> Optional[AnswerExtractionResult]:
+    async def extract_answer_for_question(self, question: str, dialog_text: str, timeout: int = 30) -> Optional[AnswerExtractionResult]:
         """Extract answer with relevance scoring and structured output"""
         start_time = time.time()
         
-        if not self.is_available():
-            return None
-            
         try:
-            response = self.client.chat.completions.create(
+            response = await self._create_completion(
+                "llm_answer",
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are an expert support response analyzer. Always respond with valid JSON."},
@@ -379,24 +520,207 @@ class OpenAIClient(BaseAIClient):
                     )
                     
         except Exception as e:
-            print(f"OpenAI API error: {e}")
+            _record_call_error(e)
             return None
                 
         return None
     
-    def extract_qa_pair_with_validation(self, dialog_text: str) -> Optional[Dict[str, Any]]:
-        """Extract and validate complete Q&A pair"""
+    async def extract_qa_pair_single_call(
+        self, dialog_text: str, timeout: int = 30
+    ) -> Optional[Tuple[QuestionExtractionResult, AnswerExtractionResult]]:
+        """Extract question and answer with one structured-output completion"""
+        start_time = time.time()
+        
+        try:
+            response = await self._create_completion(
+                "llm_qa_pair",
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are an expert support dialog analyzer. Always respond with valid JSON."},
+                    {"role": "user", "content": self._build_combined_qa_prompt(dialog_text)}
+                ],
+                **{**self.default_config, "response_format": QA_PAIR_RESPONSE_FORMAT},
+                timeout=timeout
+            )
+            
+            content = response.choices[0].message.content.strip()
+            result_data = self._extract_first_json_object(self._remove_think_and_channels(content))
+            if result_data is None:
+                return None
+            
+            # Record metrics
+            if self.enable_monitoring:
+                processing_time = time.time() - start_time
+                self._record_metrics(processing_time, response.usage.total_tokens)
+            
+            return self._qa_results_from_data(result_data)
+            
+        except Exception as e:
+            _record_call_error(e)
+            return None
+    
+    async def extract_qa_pair_streaming(
+        self, dialog_text: str, timeout: int = 30
+    ) -> Optional[Tuple[QuestionExtractionResult, AnswerExtractionResult]]:
+        """Single-call extraction that streams the JSON and stops at a null or low-confidence question"""
+        start_time = time.time()
+        self.streaming_stats["requests"] += 1
+        
+        try:
+            stream = await self._create_completion(
+                "llm_qa_pair",
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": "You are an expert support dialog analyzer. Always respond with valid JSON."},
+                    {"role": "user", "content": self._build_combined_qa_prompt(dialog_text)}
+                ],
+                **{**self.default_config, "response_format": QA_PAIR_RESPONSE_FORMAT},
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=timeout
+            )
+            
+            content, usage = "", None
+            question, confidence = None, None
+            try:
+                with span("llm_stream"):
+                    async for chunk in stream:
+                        if chunk.usage is not None:
+                            usage = chunk.usage
+                        if not chunk.choices or not chunk.choices[0].delta.content:
+                            continue
+                        content += chunk.choices[0].delta.content
+                    
+                        if confidence is not None:
+                            continue
+                        question_match = _STREAM_QUESTION_RE.match(content)
+                        if question_match is None:
+                            continue
+                        question = json.loads(question_match.group(1))
+                        if question is None:
+                            return self._stop_stream_early(None, 0.0)
+                        confidence_match = _STREAM_CONFIDENCE_RE.match(content, question_match.end())
+                        if confidence_match is None:
+                            continue
+                        confidence = float(confidence_match.group(1))
+                        if confidence < MIN_QUESTION_CONFIDENCE:
+                            return self._stop_stream_early(question, confidence)
+            finally:
+                await stream.close()
+                LLM_CALL_SECONDS.observe(time.time() - start_time, current_workspace())
+                if usage is not None:
+                    LLM_TOKENS.inc(current_workspace(), amount=usage.total_tokens)
+            
+            result_data = self._extract_first_json_object(self._remove_think_and_channels(content.strip()))
+            if result_data is None:
+                return None
+            
+            # Record metrics
+            if self.enable_monitoring and usage is not None:
+                processing_time = time.time() - start_time
+                self._record_metrics(processing_time, usage.total_tokens)
+            
+            return self._qa_results_from_data(result_data)
+            
+        except Exception as e:
+            _record_call_error(e)
+            return None
+    
+    def _stop_stream_early(
+        self, question: Optional[str], confidence: float
+    ) -> Tuple[QuestionExtractionResult, AnswerExtractionResult]:
+        """Rejected result for a cancelled stream; _build_validated_qa_pair turns it into None"""
+        self.streaming_stats["early_stops"] += 1
+        return (
+            QuestionExtractionResult(question=question, confidence=confidence, original_text=None, position=None),
+            AnswerExtractionResult(answer=None, relevance=0.0, original_text=None, support_message_id=None)
+        )
+    
+    def _qa_results_from_data(self, result_data: dict) -> Tuple[QuestionExtractionResult, AnswerExtractionResult]:
+        question_result = QuestionExtractionResult(
+            question=result_data.get("question"),
+            confidence=float(result_data.get("confidence") or 0.0),
+            original_text=result_data.get("original_text"),
+            position=result_data.get("position")
+        )
+        answer_result = AnswerExtractionResult(
+            answer=result_data.get("answer"),
+            relevance=float(result_data.get("relevance") or 0.0),
+            original_text=result_data.get("answer_original_text"),
+            support_message_id=result_data.get("support_message_id")
+        )
+        return question_result, answer_result
+    
+    @cached_property
+    def prompt_version(self) -> str:
+        """Changes whenever the extraction mode or any prompt template changes"""
+        templates = "\0".join([
+            self.extraction_mode,
+            self._build_combined_qa_prompt("{dialog}"),
+            self._build_optimized_question_prompt("{dialog}"),
+            self._build_optimized_answer_prompt("{question}", "{dialog}"),
+        ])
+        return f"{self.extraction_mode}-{hashlib.sha1(templates.encode('utf-8')).hexdigest()[:12]}"
+
+    async def extract_qa_pair_with_status(self, dialog_text: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Like extract_qa_pair_with_validation, also reporting whether the path that produced the result hit an API error"""
+        _api_error.set(None)
+        result = await self.extract_qa_pair_with_validation(dialog_text)
+        return result, _api_error.get() is not None
+    
+    async def extract_qa_pair_with_validation(self, dialog_text: str) -> Optional[Dict[str, Any]]:
+        """Extract and validate complete Q&A pair.
+
+        Raises LLMException (or CircuitOpenError) when the provider could not
+        be reached. The two-step fallback runs only after an unusable reply.
+        """
+        if self.extraction_mode in ("single", "streaming"):
+            previous_error = _api_error.get()
+            if self.extraction_mode == "streaming":
+                single_result = await self.extract_qa_pair_streaming(dialog_text)
+            else:
+                single_result = await self.extract_qa_pair_single_call(dialog_text)
+            if single_result is not None:
+                return self._build_validated_qa_pair(*single_result)
+            # Retrying an outage through two more calls only adds load; fall back only on an unusable reply
+            self._raise_new_api_error(previous_error)
+        
         # Extract question
-        question_result = self.extract_main_question(dialog_text)
+        previous_error = _api_error.get()
+        question_result = await self.extract_main_question(dialog_text)
+        if question_result is None:
+            self._raise_new_api_error(previous_error)
         if not question_result or not question_result.question:
             return None
             
         # Skip low confidence questions
-        if question_result.confidence < 0.5:
+        if question_result.confidence < MIN_QUESTION_CONFIDENCE:
             return None
             
         # Extract answer
-        answer_result = self.extract_answer_for_question(question_result.question, dialog_text)
+        answer_result = await self.extract_answer_for_question(question_result.question, dialog_text)
+        if answer_result is None:
+            self._raise_new_api_error(previous_error)
+        return self._build_validated_qa_pair(question_result, answer_result)
+
+    def _raise_new_api_error(self, previous_error: Optional[Exception]):
+        """Re-raise an API error recorded since previous_error; no-op when the call failed only to parse"""
+        error = _api_error.get()
+        if error is None or error is previous_error:
+            return
+        if isinstance(error, LLMException):
+            raise error
+        raise LLMException(f"LLM provider request failed: {error}") from error
+    
+    def _build_validated_qa_pair(
+        self,
+        question_result: QuestionExtractionResult,
+        answer_result: Optional[AnswerExtractionResult]
+    ) -> Optional[Dict[str, Any]]:
+        """Apply confidence, relevance and quality gates to extracted results"""
+        if not question_result.question or question_result.confidence < MIN_QUESTION_CONFIDENCE:
+            return None
+            
         if not answer_result or not answer_result.answer:
             return None
             
@@ -476,10 +800,6 @@ class OpenAIClient(BaseAIClient):
         )
         
         self.quality_metrics.append(metrics)
-        
-        # Keep only last 100 metrics to prevent memory issues
-        if len(self.quality_metrics) > 100:
-            self.quality_metrics = self.quality_metrics[-100:]
     
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get performance statistics"""
@@ -0,0 +1,293 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+import openai
+
+from app.core.exceptions import LLMException
+
+
+logger = logging.getLogger(__name__)
+
+# Same statuses the OpenAI SDK retries on its own
+RETRYABLE_STATUSES = {408, 409, 429}
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class CircuitOpenError(LLMException):
+    pass
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """Seconds from a rate-limit reset header such as '1s', '6m0s', '20ms' or a bare number"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    matches = _DURATION_RE.findall(value)
+    if not matches:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in matches)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    if not headers:
+        return None
+    retry_after_ms = parse_duration(headers.get("retry-after-ms"))
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    return parse_duration(headers.get("retry-after"))
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight LLM requests driven by the provider's rate-limit headers.
+
+    The limit grows by about one slot per window of successful requests and is
+    cut when the remaining request or token budget runs low or on a 429. When
+    the budget is exhausted, new requests wait until the advertised reset.
+    """
+
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 32, low_remaining_ratio: float = 0.1):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.low_remaining_ratio = low_remaining_ratio
+        self.limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self.in_flight = 0
+        self.waiting = 0
+        self.rate_limited = 0
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self._paused_until = 0.0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self):
+        async with self._condition:
+            self.waiting += 1
+            try:
+                await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+        try:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def _decrease(self, factor: float):
+        self.limit = max(float(self.min_limit), self.limit * factor)
+
+    def _pause(self, seconds: Optional[float]):
+        if seconds:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def on_response(self, headers: Mapping[str, str]):
+        self.remaining_requests = _header_int(headers, "x-ratelimit-remaining-requests")
+        self.remaining_tokens = _header_int(headers, "x-ratelimit-remaining-tokens")
+
+        ratios = []
+        for kind, remaining in (("requests", self.remaining_requests), ("tokens", self.remaining_tokens)):
+            limit = _header_int(headers, f"x-ratelimit-limit-{kind}")
+            if remaining is None or not limit:
+                continue
+            ratios.append(remaining / limit)
+            if remaining == 0:
+                self._pause(parse_duration(headers.get(f"x-ratelimit-reset-{kind}")))
+
+        if ratios and min(ratios) < self.low_remaining_ratio:
+            self._decrease(0.75)
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def on_rate_limited(self, retry_after: Optional[float]):
+        self.rate_limited += 1
+        self._decrease(0.5)
+        self._pause(retry_after)
+
+    def get_stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rate_limited": self.rate_limited,
+            "paused_for_seconds": max(0.0, self._paused_until - time.monotonic()),
+            "remaining_requests": self.remaining_requests,
+            "remaining_tokens": self.remaining_tokens,
+        }
+
+
+class CircuitBreaker:
+    """Fails fast after consecutive provider failures, then lets a single probe through after a cool-down"""
+
+    def __init__(self, failure_threshold: int = 5, recovery_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    def check(self):
+        if self.state == "closed":
+            return
+        now = time.monotonic()
+        if self.state == "open" and now - self._opened_at >= self.recovery_seconds:
+            self.state = "half_open"
+            self._probe_started = None
+        # A probe that never reported back (e.g. cancelled) expires after the cool-down
+        if self.state == "half_open" and (self._probe_started is None or now - self._probe_started >= self.recovery_seconds):
+            self._probe_started = now
+            return
+        self.rejected += 1
+        raise CircuitOpenError("LLM provider circuit is open", {"state": self.state})
+
+    def record_success(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_started = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning("LLM circuit opened after %d consecutive failures", self.consecutive_failures)
+                self.times_opened += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+
+    def get_stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class _SlotHoldingStream:
+    """A streamed completion that keeps its limiter slot until close()"""
+
+    def __init__(self, stream: openai.AsyncStream, slot: AsyncExitStack):
+        self._stream = stream
+        self._slot = slot
+
+    def __aiter__(self):
+        return self._stream.__aiter__()
+
+    def __getattr__(self, name: str):
+        return getattr(self._stream, name)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        try:
+            await self._stream.close()
+        finally:
+            await self._slot.aclose()
+
+
+class ResilientCaller:
+    """Runs raw-response OpenAI calls through the breaker, the limiter and jittered exponential retries"""
+
+    def __init__(
+        self,
+        limiter: AdaptiveConcurrencyLimiter,
+        breaker: CircuitBreaker,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0
+    ):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def call(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """`request` must return an APIResponse from `.with_raw_response`; the parsed body is returned.
+
+        A streamed body holds its limiter slot until the caller closes it.
+        """
+        self.calls += 1
+        for attempt in range(1, self.max_attempts + 1):
+            self.breaker.check()
+            retry_after = None
+            async with AsyncExitStack() as slot:
+                await slot.enter_async_context(self.limiter.slot())
+                try:
+                    raw = await request()
+                except openai.APIStatusError as e:
+                    retry_after = retry_after_seconds(e.response.headers)
+                    if e.status_code == 429:
+                        self.limiter.on_rate_limited(retry_after)
+                    elif e.status_code >= 500:
+                        self.breaker.record_failure()
+                    elif e.status_code not in RETRYABLE_STATUSES:
+                        # The provider answered; the request itself is bad
+                        self.breaker.record_success()
+                        self.failures += 1
+                        raise
+                    error = e
+                except openai.APIConnectionError as e:
+                    self.breaker.record_failure()
+                    error = e
+                else:
+                    self.limiter.on_response(raw.headers)
+                    self.breaker.record_success()
+                    parsed = raw.parse()
+                    if isinstance(parsed, openai.AsyncStream):
+                        return _SlotHoldingStream(parsed, slot.pop_all())
+                    return parsed
+
+            if attempt == self.max_attempts:
+                break
+            self.retries += 1
+            delay = retry_after or random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+            logger.info("LLM request failed (%s), retry %d in %.2fs", error, attempt, delay)
+            await asyncio.sleep(delay)
+
+        self.failures += 1
+        raise error
+
+    def get_stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "limiter": self.limiter.get_stats(),
+            "circuit_breaker": self.breaker.get_stats(),
+        }
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.database import get_db_context
+from app.models.database import DialogFingerprintModel
+from app.services.normalization import normalize_question
+
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 3
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    words = normalize_question(text).split(" ")
+    if len(words) < SHINGLE_SIZE:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little") for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+class MinHasher:
+    """MinHash signatures over word 3-gram shingles using multiply-shift hash permutations"""
+
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = _shingle_hashes(text)
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+@dataclass
+class NearDuplicateMatch:
+    ticket_id: int
+    question: Optional[str]
+    answer: Optional[str]
+    similarity: float
+
+
+class NearDuplicateIndex:
+    """In-memory LSH index of one workspace's dialog signatures"""
+
+    def __init__(self, bands: int):
+        self.bands = bands
+        self._signatures: List[np.ndarray] = []
+        self._entries: List[Tuple[int, Optional[str], Optional[str]]] = []
+        self._buckets: Dict[Tuple[int, bytes], Set[int]] = defaultdict(set)
+
+    def _band_keys(self, signature: np.ndarray):
+        rows = len(signature) // self.bands
+        for band in range(self.bands):
+            yield band, signature[band * rows:(band + 1) * rows].tobytes()
+
+    def add(self, signature: np.ndarray, ticket_id: int, question: Optional[str], answer: Optional[str]):
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        self._entries.append((ticket_id, question, answer))
+        for key in self._band_keys(signature):
+            self._buckets[key].add(index)
+
+    def find(self, signature: np.ndarray, threshold: float) -> Optional[NearDuplicateMatch]:
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+
+        best_index, best_similarity = None, threshold
+        for index in candidates:
+            similarity = float(np.mean(self._signatures[index] == signature))
+            if similarity >= best_similarity:
+                best_index, best_similarity = index, similarity
+
+        if best_index is None:
+            return None
+        ticket_id, question, answer = self._entries[best_index]
+        return NearDuplicateMatch(ticket_id=ticket_id, question=question, answer=answer, similarity=best_similarity)
+
+
+class NearDuplicateDetector:
+    """Per-workspace near-duplicate lookup for dialogs that were already sent through extraction.
+
+    Fingerprints are persisted in dialog_fingerprints and loaded into an LSH index
+    the first time a workspace is used in this process.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, bands: int = 32, llm_calls_per_extraction: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.llm_calls_per_extraction = llm_calls_per_extraction
+        self._indexes: Dict[str, NearDuplicateIndex] = {}
+        self._load_lock = asyncio.Lock()
+        self.lookups = 0
+        self.duplicates_found = 0
+
+    def signature(self, dialog_text: str) -> np.ndarray:
+        return self.hasher.signature(dialog_text)
+
+    async def _get_index(self, workspace_id: str) -> NearDuplicateIndex:
+        index = self._indexes.get(workspace_id)
+        if index is not None:
+            return index
+
+        async with self._load_lock:
+            index = self._indexes.get(workspace_id)
+            if index is None:
+                index = NearDuplicateIndex(self.bands)
+                async with get_db_context() as db:
+                    rows = await db.execute(
+                        select(
+                            DialogFingerprintModel.ticket_id,
+                            DialogFingerprintModel.signature,
+                            DialogFingerprintModel.question,
+                            DialogFingerprintModel.answer
+                        ).filter(DialogFingerprintModel.workspace_id == workspace_id)
+                    )
+                    for ticket_id, signature, question, answer in rows:
+                        index.add(np.frombuffer(signature, dtype=np.uint32), ticket_id, question, answer)
+                self._indexes[workspace_id] = index
+        return index
+
+    async def find(self, workspace_id: str, signature: np.ndarray) -> Optional[NearDuplicateMatch]:
+        try:
+            index = await self._get_index(workspace_id)
+        except Exception as e:
+            logger.warning("Near-duplicate index unavailable for %s: %s", workspace_id, e)
+            return None
+
+        self.lookups += 1
+        match = index.find(signature, self.threshold)
+        if match is not None:
+            self.duplicates_found += 1
+        return match
+
+    async def record(
+        self,
+        workspace_id: str,
+        ticket_id: int,
+        signature: np.ndarray,
+        question: Optional[str],
+        answer: Optional[str]
+    ):
+        """Remember an extraction outcome; question and answer are None when no Q&A pair was found"""
+        try:
+            index = await self._get_index(workspace_id)
+            async with get_db_context() as db:
+                db.add(DialogFingerprintModel(
+                    workspace_id=workspace_id,
+                    ticket_id=ticket_id,
+                    signature=signature.tobytes(),
+                    question=question,
+                    answer=answer
+                ))
+        except Exception as e:
+            logger.warning("Failed to record dialog fingerprint for ticket %s: %s", ticket_id, e)
+            return
+        index.add(signature, ticket_id, question, answer)
+
+    def get_stats(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "workspaces_loaded": len(self._indexes),
+            "lookups": self.lookups,
+            "duplicates_found": self.duplicates_found,
+            "extractions_skipped": self.duplicates_found,
+            "llm_calls_saved": self.duplicates_found * self.llm_calls_per_extraction,
+        }
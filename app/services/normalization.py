@@ -0,0 +1,15 @@
+import hashlib
+import re
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_question(text: str) -> str:
+    """Case- and whitespace-insensitive form of a question used as a lookup key"""
+    return _WHITESPACE_RE.sub(" ", text).strip().lower()
+
+
+def question_hash(text: str) -> str:
+    """Stable digest of the normalized question, stored on QAModel for exact-match lookups"""
+    return hashlib.sha256(normalize_question(text).encode("utf-8")).hexdigest()
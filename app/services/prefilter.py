@@ -0,0 +1,203 @@
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.schemas import Dialog, RoleType
+
+
+logger = logging.getLogger(__name__)
+
+PREFILTER_MODES = ("off", "shadow", "enforce")
+
+INTERROGATIVE_WORDS = {
+    "how", "what", "where", "when", "why", "which", "who", "can", "could", "is", "are", "does", "do", "should",
+    "как", "что", "где", "когда", "почему", "зачем", "какой", "какая", "какие", "можно", "ли", "сколько",
+}
+PROBLEM_WORDS = {
+    "error", "problem", "issue", "fail", "failed", "fails", "broken", "cannot", "can't", "unable", "help", "doesn't", "not",
+    "ошибка", "ошибку", "проблема", "проблему", "помогите", "подскажите", "не",
+}
+ACTION_PHRASES = (
+    "go to", "click", "select", "enter", "set", "open", "install", "update", "restart", "clear",
+    "перейдите", "нажмите", "выберите", "введите", "откройте", "установите", "обновите", "перезапустите",
+)
+
+# Support replies shorter than this are acknowledgements, not answers
+MIN_REPLY_WORDS = 3
+
+# Text fed to the optional model: the opening user turns, capped
+MODEL_INPUT_CHARS = 1000
+
+_WORD_RE = re.compile(r"[\w']+")
+
+
+@dataclass
+class PrefilterDecision:
+    accepted: bool
+    score: float
+    rule_score: float
+    model_score: Optional[float] = None
+    reasons: List[str] = field(default_factory=list)
+
+
+def _question_score(text: str) -> float:
+    words = set(_WORD_RE.findall(text.lower()))
+    if "?" in text:
+        return 1.0
+    if words & INTERROGATIVE_WORDS:
+        return 0.7
+    if words & PROBLEM_WORDS:
+        return 0.6
+    return 0.1
+
+
+def _answer_score(text: str) -> float:
+    lowered = text.lower()
+    word_count = len(_WORD_RE.findall(lowered))
+    if word_count < MIN_REPLY_WORDS:
+        return 0.0
+    score = 0.6 if word_count >= 8 else 0.3
+    if any(phrase in lowered for phrase in ACTION_PHRASES):
+        score += 0.4
+    return min(score, 1.0)
+
+
+def opening_user_text(dialog: List[Dialog]) -> str:
+    """User turns before the first support reply"""
+    turns = []
+    for msg in dialog:
+        if msg.role == RoleType.SUPPORT:
+            break
+        turns.append(msg.content)
+    return "\n".join(turns)[:MODEL_INPUT_CHARS]
+
+
+def rule_score(dialog: List[Dialog]) -> Tuple[float, List[str]]:
+    """(score, reasons) from the same kinds of signals _validate_qa_pair checks after extraction"""
+    first_user = next((i for i, msg in enumerate(dialog) if msg.role == RoleType.USER and msg.content.strip()), None)
+    if first_user is None:
+        return 0.0, ["no_user_message"]
+
+    replies = [msg.content for msg in dialog[first_user + 1:] if msg.role == RoleType.SUPPORT]
+    answer = max((_answer_score(reply) for reply in replies), default=0.0)
+    if answer == 0.0:
+        return 0.0, ["no_support_reply"]
+
+    # Only user turns that a later support reply could answer
+    last_reply = max(i for i, msg in enumerate(dialog) if msg.role == RoleType.SUPPORT)
+    question = max(
+        _question_score(msg.content)
+        for msg in dialog[first_user:last_reply]
+        if msg.role == RoleType.USER
+    )
+
+    reasons = []
+    if question < 0.5:
+        reasons.append("no_question_signal")
+    if answer < 0.5:
+        reasons.append("weak_support_reply")
+    return 0.5 * question + 0.5 * answer, reasons
+
+
+class DialogPrefilter:
+    """Scores a dialog locally before any LLM call.
+
+    The rule score can be blended with a logistic model over the embedding of
+    the opening user turns (weights trained by ``python -m app.cli.train_prefilter``).
+    In shadow mode nothing is rejected; decisions and the later extraction
+    outcome are logged and counted so the precision of rejections can be
+    measured before switching to enforce.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.3,
+        mode: str = "shadow",
+        model_path: Optional[str] = None,
+        encode: Optional[Callable[[str], Awaitable[np.ndarray]]] = None
+    ):
+        if mode not in PREFILTER_MODES:
+            raise ValueError(f"Unknown prefilter mode: {mode}")
+        self.threshold = threshold
+        self.mode = mode
+        self.encode = encode
+        self.coef = None
+        self.intercept = 0.0
+        if model_path:
+            weights = np.load(model_path)
+            self.coef = weights["coef"].astype(np.float32)
+            self.intercept = float(weights["intercept"])
+        self.evaluated = 0
+        self.rejected = 0
+        self.outcomes = {
+            "accepted_extracted": 0,
+            "accepted_empty": 0,
+            "rejected_extracted": 0,
+            "rejected_empty": 0,
+        }
+
+    @property
+    def blocks_extraction(self) -> bool:
+        return self.mode == "enforce"
+
+    async def _model_score(self, dialog: List[Dialog]) -> Optional[float]:
+        if self.coef is None or self.encode is None:
+            return None
+        text = opening_user_text(dialog)
+        if not text:
+            return 0.0
+        try:
+            vector = np.asarray(await self.encode(text), dtype=np.float32)
+        except Exception as e:
+            logger.warning("Prefilter model scoring failed: %s", e)
+            return None
+        return float(1.0 / (1.0 + np.exp(-(vector @ self.coef + self.intercept))))
+
+    async def evaluate(self, workspace_id: str, ticket_id: int, dialog: List[Dialog]) -> PrefilterDecision:
+        rules, reasons = rule_score(dialog)
+        model = await self._model_score(dialog) if rules > 0 else None
+        score = rules if model is None else (rules + model) / 2
+        decision = PrefilterDecision(
+            accepted=score >= self.threshold,
+            score=score,
+            rule_score=rules,
+            model_score=model,
+            reasons=reasons
+        )
+
+        self.evaluated += 1
+        if not decision.accepted:
+            self.rejected += 1
+        logger.info(
+            "prefilter decision workspace=%s ticket=%s mode=%s accepted=%s score=%.3f rule_score=%.3f model_score=%s reasons=%s",
+            workspace_id, ticket_id, self.mode, decision.accepted, score, rules,
+            "-" if model is None else f"{model:.3f}", ",".join(reasons) or "-"
+        )
+        return decision
+
+    def record_outcome(self, workspace_id: str, ticket_id: int, decision: PrefilterDecision, extracted: bool):
+        """Pair a decision with what the full pipeline found for the same dialog"""
+        key = f"{'accepted' if decision.accepted else 'rejected'}_{'extracted' if extracted else 'empty'}"
+        self.outcomes[key] += 1
+        logger.info(
+            "prefilter outcome workspace=%s ticket=%s accepted=%s extracted=%s score=%.3f",
+            workspace_id, ticket_id, decision.accepted, extracted, decision.score
+        )
+
+    def get_stats(self) -> dict:
+        rejected_with_outcome = self.outcomes["rejected_extracted"] + self.outcomes["rejected_empty"]
+        return {
+            "mode": self.mode,
+            "threshold": self.threshold,
+            "model_loaded": self.coef is not None,
+            "evaluated": self.evaluated,
+            "rejected": self.rejected,
+            "outcomes": self.outcomes,
+            # Share of rejected dialogs where the LLM found nothing either; known only from shadow runs
+            "rejection_precision": (
+                self.outcomes["rejected_empty"] / rejected_with_outcome if rejected_with_outcome else None
+            ),
+        }
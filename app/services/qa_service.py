@@ -1,40 +1,75 @@
+from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy.orm import Session as SQLAlchemySession
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.database import QAModel
+from app.services.normalization import question_hash
 
 
-def save_qa(
-    db: SQLAlchemySession, 
+async def save_qa(
+    db: AsyncSession,
     workspace_id: str,
-    ticket_id: int, 
-    question: str, 
-    answer: str, 
-    source: dict
+    ticket_id: int,
+    question: str,
+    answer: str,
+    source: dict,
+    created_at: Optional[datetime] = None
 ) -> int:
     qa = QAModel(
         workspace_id=workspace_id,
         ticket_id=ticket_id,
         question=question,
+        question_hash=question_hash(question),
         answer=answer,
-        source=source
+        source=source,
+        created_at=created_at or datetime.now()
     )
     db.add(qa)
-    db.commit()
-    db.refresh(qa)
+    await db.commit()
+    await db.refresh(qa)
     return qa.id
 
 
-def get_qa(db: SQLAlchemySession, workspace_id: str, ticket_ids: List[int]) -> List[QAModel]:
-    return db.query(QAModel).filter(
-        QAModel.workspace_id == workspace_id,
-        QAModel.ticket_id.in_(ticket_ids)
-    ).all()
+async def save_qa_bulk(db: AsyncSession, workspace_id: str, rows: List[dict]) -> int:
+    """Insert many Q&A rows with one executemany; rows carry ticket_id, question, answer, source"""
+    if not rows:
+        return 0
+    await db.execute(
+        insert(QAModel),
+        [{**row, "workspace_id": workspace_id, "question_hash": question_hash(row["question"])} for row in rows]
+    )
+    await db.commit()
+    return len(rows)
+
+
+async def get_qa(db: AsyncSession, workspace_id: str, ticket_ids: List[int]) -> List[QAModel]:
+    result = await db.execute(
+        select(QAModel).filter(
+            QAModel.workspace_id == workspace_id,
+            QAModel.ticket_id.in_(ticket_ids)
+        )
+    )
+    return list(result.scalars().all())
 
 
-def get_qa_by_ticket_id(db: SQLAlchemySession, workspace_id: str, ticket_id: int) -> Optional[QAModel]:
-    return db.query(QAModel).filter(
-        QAModel.workspace_id == workspace_id,
-        QAModel.ticket_id == ticket_id
-    ).first()
+async def get_qa_by_ticket_id(db: AsyncSession, workspace_id: str, ticket_id: int) -> Optional[QAModel]:
+    result = await db.execute(
+        select(QAModel).filter(
+            QAModel.workspace_id == workspace_id,
+            QAModel.ticket_id == ticket_id
+        ).limit(1)
+    )
+    return result.scalars().first()
+
+
+async def get_qa_by_question(db: AsyncSession, workspace_id: str, question: str, limit: int = 5) -> List[QAModel]:
+    """Rows whose stored question equals the given one after case and whitespace normalization"""
+    result = await db.execute(
+        select(QAModel).filter(
+            QAModel.workspace_id == workspace_id,
+            QAModel.question_hash == question_hash(question)
+        ).order_by(QAModel.created_at.desc()).limit(limit)
+    )
+    return list(result.scalars().all())
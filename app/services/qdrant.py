@@ -1,35 +1,131 @@
-from typing import List, Dict
+import asyncio
+import time
+from datetime import datetime
+from typing import List, Dict, Optional, Union
 
+import grpc
+import httpx
 import numpy as np
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models
+from qdrant_client.http.exceptions import UnexpectedResponse
+
+from app.core.config import Config
+from app.core.metrics import QDRANT_SEARCH_SECONDS, QDRANT_UPSERT_SECONDS, STAGE_ERRORS, current_workspace
+from app.core.tracing import span
+from app.services.flat_index import FlatVectorIndex
+from app.services.qdrant_profiles import COLLECTION_PROFILES, CollectionProfile, get_collection_profile
+
+
+def build_point_payload(ticket_id: int, question: str, answer: str, created_at: datetime) -> Dict:
+    """Compact point payload: just enough to answer a search without touching the database"""
+    return {
+        "ticket_id": ticket_id,
+        "question": question,
+        "answer": answer,
+        "created_at": created_at.isoformat()
+    }
+
+
+def is_lean_payload(payload: Optional[Dict]) -> bool:
+    return bool(payload) and payload.get("answer") is not None and "dialog" not in payload
+
+
+QDRANT_TRANSPORTS = ("rest", "grpc")
+
+
+def create_qdrant_client(
+    url: str,
+    transport: str = "rest",
+    timeout: Optional[int] = None,
+    pool_size: Optional[int] = None,
+    grpc_port: int = 6334
+) -> AsyncQdrantClient:
+    """Client for a Qdrant server, or for local in-process mode when url is ":memory:" (benchmarks, dev).
+
+    pool_size bounds the REST connection pool and keeps that many connections
+    alive; without it the client disables keep-alive for localhost servers.
+    """
+    if url == ":memory:":
+        return AsyncQdrantClient(location=":memory:")
+    if transport not in QDRANT_TRANSPORTS:
+        raise ValueError(f"Unknown Qdrant transport: {transport}. Available: {', '.join(QDRANT_TRANSPORTS)}")
+
+    options = {}
+    if pool_size is not None:
+        options["limits"] = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return AsyncQdrantClient(
+            url=url,
+            prefer_grpc=transport == "grpc",
+            grpc_port=grpc_port,
+            timeout=timeout,
+            **options
+        )
+
+
+def is_missing_collection_error(error: Exception) -> bool:
+    if isinstance(error, grpc.RpcError):
+        return error.code() == grpc.StatusCode.NOT_FOUND
+    return isinstance(error, UnexpectedResponse) and error.status_code == 404
 
 
 class QdrantHelper:
-    def __init__(self, url: str, collection_name: str, workspace_id: str = None):
-        import warnings
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            self.client = QdrantClient(url=url, prefer_grpc=False)
+    def __init__(
+        self,
+        url: str,
+        collection_name: str,
+        workspace_id: str = None,
+        client: Optional[AsyncQdrantClient] = None,
+        profile: CollectionProfile = COLLECTION_PROFILES["default"]
+    ):
+        self.client = client or create_qdrant_client(url)
+        self.profile = profile
         self.base_collection_name = collection_name
         self.workspace_id = workspace_id
         self.collection_name = f"{workspace_id}_{collection_name}" if workspace_id else collection_name
         self.vector_size = 384
-        self._init_collection()
+        self._collection_ready = False
+        self._collection_lock = asyncio.Lock()
+
+    @property
+    def metrics_label(self) -> str:
+        return self.workspace_id or current_workspace()
 
-    def _init_collection(self):
+    async def init_collection(self):
+        if self._collection_ready:
+            return
+
+        async with self._collection_lock:
+            if self._collection_ready:
+                return
+            try:
+                if not await self.client.collection_exists(self.collection_name):
+                    await self.client.create_collection(
+                        collection_name=self.collection_name,
+                        vectors_config=self.profile.vectors_config(self.vector_size),
+                        hnsw_config=self.profile.hnsw_config(),
+                        quantization_config=self.profile.quantization_config()
+                    )
+            except Exception as e:
+                raise ValueError(f"Error initializing collection: {e}")
+            self._collection_ready = True
+
+    async def _call_collection(self, method, **kwargs):
+        """Call a collection-scoped client method, recreating the collection once if Qdrant lost it"""
+        await self.init_collection()
         try:
-            collections = self.client.get_collections()
-            names = [c.name for c in collections.collections]
-            if self.collection_name not in names:
-                self.client.recreate_collection(
-                    collection_name=self.collection_name,
-                    vectors_config=models.VectorParams(size=self.vector_size, distance=models.Distance.COSINE)
-                )
+            return await method(collection_name=self.collection_name, **kwargs)
         except Exception as e:
-            raise ValueError(f"Error initializing collection: {e}")
+            if not is_missing_collection_error(e):
+                raise
+            self._collection_ready = False
+            await self.init_collection()
+            return await method(collection_name=self.collection_name, **kwargs)
 
-    def add_vector(self, vector: np.ndarray, payload: Dict):
+    async def add_vector(self, vector: np.ndarray, payload: Dict):
         if vector.ndim == 1:
             vector = vector.tolist()
         elif vector.ndim == 2 and vector.shape[0] == 1:
@@ -38,60 +134,293 @@ class QdrantHelper:
             raise ValueError("Vector must be 1D or 2D with shape (1, N)")
 
         point_id = payload.get("ticket_id")
-        
+
         if self.workspace_id:
             payload = {**payload, "workspace_id": self.workspace_id}
 
+        started = time.perf_counter()
         try:
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=[
-                    models.PointStruct(id=point_id, vector=vector, payload=payload)
-                ]
-            )
+            with span("vector_upsert"):
+                await self._call_collection(
+                    self.client.upsert,
+                    points=[
+                        models.PointStruct(id=point_id, vector=vector, payload=payload)
+                    ]
+                )
         except Exception as e:
+            STAGE_ERRORS.inc(self.metrics_label, "qdrant_upsert")
             raise ValueError(f"Error adding vector: {e}")
+        finally:
+            QDRANT_UPSERT_SECONDS.observe(time.perf_counter() - started, self.metrics_label)
 
-    def search_similar(self, query_vector: np.ndarray, top_k: int = 5, score_threshold: float = 0.1) -> List[Dict]:
-        if query_vector.ndim == 1:
-            query_vector = query_vector.tolist()
-        elif query_vector.ndim == 2 and query_vector.shape[0] == 1:
-            query_vector = query_vector[0].tolist()
-        else:
+    async def add_vectors(self, vectors: np.ndarray, payloads: List[Dict], batch_size: int = 256):
+        """Upsert many points, one request per batch_size points"""
+        if vectors.ndim != 2 or vectors.shape[0] != len(payloads):
+            raise ValueError("vectors must be 2D with one row per payload")
+
+        if self.workspace_id:
+            payloads = [{**payload, "workspace_id": self.workspace_id} for payload in payloads]
+        ids = [payload.get("ticket_id") for payload in payloads]
+
+        try:
+            for start in range(0, len(ids), batch_size):
+                end = start + batch_size
+                # One tolist per batch; the rows are already float vectors, so skip
+                # re-validating every element as a PointStruct would
+                batch = models.Batch.model_construct(
+                    ids=ids[start:end],
+                    vectors=vectors[start:end].tolist(),
+                    payloads=payloads[start:end]
+                )
+                started = time.perf_counter()
+                with span("vector_upsert"):
+                    await self._call_collection(self.client.upsert, points=batch)
+                QDRANT_UPSERT_SECONDS.observe(time.perf_counter() - started, self.metrics_label)
+        except Exception as e:
+            STAGE_ERRORS.inc(self.metrics_label, "qdrant_upsert")
+            raise ValueError(f"Error adding vectors: {e}")
+
+    async def search_similar(self, query_vector: np.ndarray, top_k: int = 5, score_threshold: float = 0.1) -> List[Dict]:
+        # The client takes NumPy query vectors as they are
+        if query_vector.ndim == 2 and query_vector.shape[0] == 1:
+            query_vector = query_vector[0]
+        elif query_vector.ndim != 1:
             raise ValueError("query_vector must be 1D or 2D with shape (1, N)")
 
+        started = time.perf_counter()
         try:
-            query_filter = None
-            if self.workspace_id:
-                query_filter = models.Filter(
-                    must=[
-                        models.FieldCondition(
-                            key="workspace_id",
-                            match=models.MatchValue(value=self.workspace_id)
+            with span("vector_search"):
+                results = await self._call_collection(
+                    self.client.search,
+                    query_vector=query_vector,
+                    limit=top_k,
+                    with_payload=True,
+                    query_filter=self._workspace_filter(),
+                    search_params=self.profile.search_params()
+                )
+            return self._process_points(results, score_threshold)
+
+        except Exception as e:
+            STAGE_ERRORS.inc(self.metrics_label, "qdrant_search")
+            raise ValueError(f"Error searching vectors: {e}")
+        finally:
+            QDRANT_SEARCH_SECONDS.observe(time.perf_counter() - started, self.metrics_label)
+
+    async def search_similar_batch(
+        self, query_vectors: np.ndarray, top_k: int = 5, score_threshold: float = 0.1
+    ) -> List[List[Dict]]:
+        """Search several query vectors in one request; results are returned per query"""
+        if query_vectors.ndim != 2:
+            raise ValueError("query_vectors must be 2D with one row per query")
+
+        query_filter = self._workspace_filter()
+        search_params = self.profile.search_params()
+        started = time.perf_counter()
+        try:
+            with span("vector_search"):
+                batch_results = await self._call_collection(
+                    self.client.search_batch,
+                    requests=[
+                        models.SearchRequest(
+                            vector=query_vector,
+                            limit=top_k,
+                            with_payload=True,
+                            filter=query_filter,
+                            params=search_params
                         )
+                        for query_vector in query_vectors.tolist()
                     ]
                 )
-            
-            results = self.client.search(
+            return [self._process_points(results, score_threshold) for results in batch_results]
+
+        except Exception as e:
+            STAGE_ERRORS.inc(self.metrics_label, "qdrant_search")
+            raise ValueError(f"Error searching vectors: {e}")
+        finally:
+            QDRANT_SEARCH_SECONDS.observe(time.perf_counter() - started, self.metrics_label)
+
+    async def apply_profile(self, profile: CollectionProfile):
+        """Move an existing collection to another profile; Qdrant rebuilds indexes in the background"""
+        await self.init_collection()
+        try:
+            await self.client.update_collection(
                 collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=top_k,
-                with_payload=True,
-                query_filter=query_filter
+                vectors_config={"": models.VectorParamsDiff(on_disk=profile.on_disk_vectors)},
+                hnsw_config=profile.hnsw_config(),
+                quantization_config=profile.quantization_config() or models.Disabled.DISABLED
             )
-            
-            processed_results = [
-                {
-                    "ticket_id": point.payload.get("ticket_id"),
-                    "question": point.payload.get("question"),
-                    "answer": point.payload.get("answer"),
-                    "score": point.score
-                }
-                for point in results
-                if point.score >= score_threshold
-            ]
-            
-            return processed_results
-            
         except Exception as e:
-            raise ValueError(f"Error searching vectors: {e}")
+            raise ValueError(f"Error applying collection profile: {e}")
+        self.profile = profile
+
+    async def scroll_points(self, offset=None, limit: int = 256):
+        """One page of points with payloads; returns (points, next_offset)"""
+        return await self._call_collection(
+            self.client.scroll,
+            offset=offset,
+            limit=limit,
+            with_payload=True,
+            with_vectors=False
+        )
+
+    async def overwrite_payloads(self, payloads: Dict[int, Dict]):
+        """Replace the payload of many points in one request"""
+        if not payloads:
+            return
+        await self._call_collection(
+            self.client.batch_update_points,
+            update_operations=[
+                models.OverwritePayloadOperation(
+                    overwrite_payload=models.SetPayload(
+                        payload={**payload, "workspace_id": self.workspace_id} if self.workspace_id else payload,
+                        points=[point_id]
+                    )
+                )
+                for point_id, payload in payloads.items()
+            ]
+        )
+
+    def _workspace_filter(self) -> Optional[models.Filter]:
+        if not self.workspace_id:
+            return None
+        return models.Filter(
+            must=[
+                models.FieldCondition(
+                    key="workspace_id",
+                    match=models.MatchValue(value=self.workspace_id)
+                )
+            ]
+        )
+
+    def _process_points(self, points, score_threshold: float) -> List[Dict]:
+        return [
+            {
+                "ticket_id": point.payload.get("ticket_id"),
+                "question": point.payload.get("question"),
+                "answer": point.payload.get("answer"),
+                "score": point.score,
+                "is_lean": is_lean_payload(point.payload)
+            }
+            for point in points
+            if point.score >= score_threshold
+        ]
+
+
+VECTOR_STORE_BACKENDS = ("qdrant", "flat")
+
+VectorStore = Union[QdrantHelper, FlatVectorIndex]
+
+
+class QdrantRegistry:
+    """Process-wide cache of per-workspace vector stores; Qdrant helpers share one pooled client"""
+
+    def __init__(
+        self,
+        url: str,
+        collection_name: str,
+        default_profile: CollectionProfile = COLLECTION_PROFILES["default"],
+        workspace_profiles: Optional[Dict[str, CollectionProfile]] = None,
+        transport: str = "rest",
+        timeout: Optional[int] = None,
+        pool_size: Optional[int] = None,
+        grpc_port: int = 6334,
+        default_backend: str = "qdrant",
+        workspace_backends: Optional[Dict[str, str]] = None,
+        flat_index_path: str = "./flat_index"
+    ):
+        for backend in (default_backend, *(workspace_backends or {}).values()):
+            if backend not in VECTOR_STORE_BACKENDS:
+                raise ValueError(f"Unknown vector store backend: {backend}. Available: {', '.join(VECTOR_STORE_BACKENDS)}")
+        self.url = url
+        self.collection_name = collection_name
+        self.default_profile = default_profile
+        self.workspace_profiles = workspace_profiles or {}
+        self.transport = transport
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.grpc_port = grpc_port
+        self.default_backend = default_backend
+        self.workspace_backends = workspace_backends or {}
+        self.flat_index_path = flat_index_path
+        self._client: Optional[AsyncQdrantClient] = None
+        self._helpers: Dict[str, VectorStore] = {}
+
+    @classmethod
+    def from_config(cls, config: Config) -> "QdrantRegistry":
+        def profile(name: str) -> CollectionProfile:
+            return get_collection_profile(
+                name,
+                hnsw_m=config.qdrant_hnsw_m,
+                hnsw_ef_construct=config.qdrant_hnsw_ef_construct,
+                hnsw_ef=config.qdrant_hnsw_ef
+            )
+
+        return cls(
+            url=config.qdrant_url,
+            collection_name=config.qdrant_collection_name,
+            default_profile=profile(config.qdrant_collection_profile),
+            workspace_profiles={
+                workspace_id: profile(name)
+                for workspace_id, name in config.qdrant_workspace_profiles.items()
+            },
+            transport=config.qdrant_transport,
+            timeout=config.qdrant_timeout_seconds,
+            pool_size=config.qdrant_pool_size,
+            grpc_port=config.qdrant_grpc_port,
+            default_backend=config.vector_store_backend,
+            workspace_backends=config.vector_store_workspace_backends,
+            flat_index_path=config.flat_index_path
+        )
+
+    def profile_for(self, workspace_id: str) -> CollectionProfile:
+        return self.workspace_profiles.get(workspace_id, self.default_profile)
+
+    def backend_for(self, workspace_id: str) -> str:
+        return self.workspace_backends.get(workspace_id, self.default_backend)
+
+    @property
+    def uses_qdrant(self) -> bool:
+        return self.default_backend == "qdrant" or "qdrant" in self.workspace_backends.values()
+
+    @property
+    def client(self) -> AsyncQdrantClient:
+        if self._client is None:
+            self._client = create_qdrant_client(
+                self.url,
+                transport=self.transport,
+                timeout=self.timeout,
+                pool_size=self.pool_size,
+                grpc_port=self.grpc_port
+            )
+        return self._client
+
+    def _create(self, workspace_id: str) -> VectorStore:
+        if self.backend_for(workspace_id) == "flat":
+            return FlatVectorIndex(
+                path=self.flat_index_path,
+                collection_name=self.collection_name,
+                workspace_id=workspace_id
+            )
+        return QdrantHelper(
+            url=self.url,
+            collection_name=self.collection_name,
+            workspace_id=workspace_id,
+            client=self.client,
+            profile=self.profile_for(workspace_id)
+        )
+
+    async def get(self, workspace_id: str) -> VectorStore:
+        helper = self._helpers.get(workspace_id)
+        if helper is None:
+            helper = self._helpers.setdefault(workspace_id, self._create(workspace_id))
+        await helper.init_collection()
+        return helper
+
+    async def close(self):
+        for helper in self._helpers.values():
+            if isinstance(helper, FlatVectorIndex):
+                helper.close()
+        self._helpers.clear()
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
@@ -0,0 +1,88 @@
+from dataclasses import dataclass, replace
+from typing import Dict, Literal, Optional
+
+from qdrant_client.http import models
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """Storage and index layout of a workspace collection"""
+    name: str
+    quantization: Optional[Literal["scalar", "binary"]] = None
+    on_disk_vectors: bool = False
+    hnsw_m: Optional[int] = None
+    hnsw_ef_construct: Optional[int] = None
+    hnsw_ef: Optional[int] = None
+    oversampling: Optional[float] = None
+    rescore: bool = True
+
+    def vectors_config(self, vector_size: int) -> models.VectorParams:
+        return models.VectorParams(
+            size=vector_size,
+            distance=models.Distance.COSINE,
+            on_disk=self.on_disk_vectors
+        )
+
+    def hnsw_config(self) -> Optional[models.HnswConfigDiff]:
+        if self.hnsw_m is None and self.hnsw_ef_construct is None:
+            return None
+        return models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self):
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        return None
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        if self.quantization is None and self.hnsw_ef is None:
+            return None
+        quantization = None
+        if self.quantization is not None:
+            quantization = models.QuantizationSearchParams(
+                rescore=self.rescore,
+                oversampling=self.oversampling
+            )
+        return models.SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+
+COLLECTION_PROFILES: Dict[str, CollectionProfile] = {
+    profile.name: profile
+    for profile in (
+        # float32 vectors and HNSW graph in RAM, the original layout
+        CollectionProfile(name="default"),
+        # float32 originals on disk, only the HNSW graph in RAM
+        CollectionProfile(name="on_disk", on_disk_vectors=True),
+        # int8 copies in RAM (4x smaller), float originals on disk used for rescoring
+        CollectionProfile(name="scalar_int8", quantization="scalar", on_disk_vectors=True, oversampling=2.0),
+        # 1-bit copies in RAM (32x smaller); needs heavier oversampling to keep recall
+        CollectionProfile(name="binary", quantization="binary", on_disk_vectors=True, oversampling=3.0),
+    )
+}
+
+
+def get_collection_profile(
+    name: str,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construct: Optional[int] = None,
+    hnsw_ef: Optional[int] = None
+) -> CollectionProfile:
+    profile = COLLECTION_PROFILES.get(name)
+    if profile is None:
+        raise ValueError(f"Unknown collection profile: {name}. Available: {', '.join(COLLECTION_PROFILES)}")
+
+    overrides = {
+        key: value
+        for key, value in (("hnsw_m", hnsw_m), ("hnsw_ef_construct", hnsw_ef_construct), ("hnsw_ef", hnsw_ef))
+        if value is not None
+    }
+    return replace(profile, **overrides) if overrides else profile
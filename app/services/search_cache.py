@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Generic, Optional, Tuple, TypeVar
+
+from app.services.normalization import normalize_question
+
+
+T = TypeVar("T")
+
+
+class SearchResultCache(Generic[T]):
+    """LRU cache of search responses invalidated by a per-workspace generation counter.
+
+    Writes to a workspace bump its generation, which makes every cached entry
+    of that workspace stale without scanning the cache. The TTL bounds how long
+    a worker can serve results that another worker's write has outdated.
+    Callers read generation() before searching and pass it to set(), so a
+    result computed before a concurrent write is never stored as current.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str, int], Tuple[int, float, T]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+
+    def _key(self, workspace_id: str, question: str, top_k: int) -> Tuple[str, str, int]:
+        return workspace_id, normalize_question(question), top_k
+
+    def generation(self, workspace_id: str) -> int:
+        return self._generations.get(workspace_id, 0)
+
+    def get(self, workspace_id: str, question: str, top_k: int) -> Optional[T]:
+        key = self._key(workspace_id, question, top_k)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        generation, expires_at, value = entry
+        if generation != self.generation(workspace_id) or expires_at < time.monotonic():
+            del self._entries[key]
+            self.stale += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, workspace_id: str, question: str, top_k: int, value: T, generation: int):
+        """Store a result computed at `generation`; dropped if the workspace was written to since"""
+        if generation != self.generation(workspace_id):
+            return
+        key = self._key(workspace_id, question, top_k)
+        self._entries[key] = (generation, time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, workspace_id: str):
+        self._generations[workspace_id] = self._generations.get(workspace_id, 0) + 1
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
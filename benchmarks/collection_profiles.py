@@ -0,0 +1,143 @@
+"""Recall vs latency of collection profiles against the float32 baseline.
+
+Needs a running Qdrant server (local mode does not implement quantization).
+
+    python -m benchmarks.collection_profiles --synthetic 20000
+    python -m benchmarks.collection_profiles --workspace it_support --collection qa_support
+
+Each profile gets a temporary collection holding the same vectors. Recall@k is
+measured against exact brute-force cosine top-k computed with NumPy.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+from qdrant_client.http import models
+
+from app.services.qdrant import QdrantHelper, create_qdrant_client
+from app.services.qdrant_profiles import COLLECTION_PROFILES, get_collection_profile
+
+
+VECTOR_SIZE = 384
+
+
+def synthetic_vectors(count: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors, closer to real question embeddings than uniform noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, count // 50), VECTOR_SIZE)).astype(np.float32)
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.35 * rng.standard_normal((count, VECTOR_SIZE)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def workspace_vectors(client, collection_name: str) -> np.ndarray:
+    vectors, offset = [], None
+    while True:
+        points, offset = await client.scroll(
+            collection_name=collection_name, offset=offset, limit=1024, with_payload=False, with_vectors=True
+        )
+        vectors.extend(point.vector for point in points)
+        if offset is None:
+            break
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def wait_until_indexed(client, collection_name: str, timeout: float = 600.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = await client.get_collection(collection_name)
+        if info.status == models.CollectionStatus.GREEN:
+            return
+        await asyncio.sleep(0.5)
+    raise TimeoutError(f"{collection_name} was not indexed within {timeout:.0f}s")
+
+
+async def benchmark_profile(client, profile, vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray, top_k: int) -> dict:
+    collection_name = f"bench_profile_{profile.name}"
+    if await client.collection_exists(collection_name):
+        await client.delete_collection(collection_name)
+
+    helper = QdrantHelper(url="", collection_name=collection_name, client=client, profile=profile)
+    try:
+        started = time.perf_counter()
+        await helper.add_vectors(vectors, [{"ticket_id": index} for index in range(len(vectors))], batch_size=1024)
+        await wait_until_indexed(client, collection_name)
+        build_seconds = time.perf_counter() - started
+
+        latencies, recalls = [], []
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            results = await helper.search_similar(query, top_k=top_k, score_threshold=-1.0)
+            latencies.append((time.perf_counter() - started) * 1000)
+            found = {result["ticket_id"] for result in results}
+            recalls.append(len(found.intersection(expected.tolist())) / top_k)
+    finally:
+        await client.delete_collection(collection_name)
+
+    return {
+        "profile": profile.name,
+        "recall_at_k": float(np.mean(recalls)),
+        "latency_ms_p50": float(np.percentile(latencies, 50)),
+        "latency_ms_p95": float(np.percentile(latencies, 95)),
+        "latency_ms_mean": float(np.mean(latencies)),
+        "build_seconds": build_seconds,
+    }
+
+
+async def run(args: argparse.Namespace):
+    client = create_qdrant_client(args.url)
+    try:
+        if args.workspace:
+            vectors = await workspace_vectors(client, f"{args.workspace}_{args.collection}")
+        else:
+            vectors = synthetic_vectors(args.synthetic, args.seed)
+
+        rng = np.random.default_rng(args.seed + 1)
+        queries = vectors[rng.integers(0, len(vectors), args.queries)]
+        queries = queries + 0.05 * rng.standard_normal(queries.shape).astype(np.float32)
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+        truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.top_k]
+
+        profiles = [
+            get_collection_profile(name, hnsw_m=args.hnsw_m, hnsw_ef_construct=args.hnsw_ef_construct, hnsw_ef=args.hnsw_ef)
+            for name in (args.profile or list(COLLECTION_PROFILES))
+        ]
+        results = []
+        for profile in profiles:
+            result = await benchmark_profile(client, profile, vectors, queries, truth, args.top_k)
+            results.append(result)
+            print(
+                f"{result['profile']:>12}: recall@{args.top_k}={result['recall_at_k']:.3f} "
+                f"p50={result['latency_ms_p50']:.2f}ms p95={result['latency_ms_p95']:.2f}ms"
+            )
+    finally:
+        await client.close()
+
+    report = {"vectors": len(vectors), "queries": args.queries, "top_k": args.top_k, "results": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark collection profiles: recall vs latency")
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL", "http://localhost:6333"), help="Qdrant server URL")
+    parser.add_argument("--workspace", help="Take vectors from this workspace's collection instead of synthetic data")
+    parser.add_argument("--collection", default=os.getenv("QDRANT_COLLECTION_NAME", "qa_support"), help="Base collection name")
+    parser.add_argument("--synthetic", type=int, default=20000, help="Number of synthetic vectors")
+    parser.add_argument("--queries", type=int, default=500, help="Number of queries")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--profile", action="append", choices=list(COLLECTION_PROFILES), help="Profile to test (repeatable, default: all)")
+    parser.add_argument("--hnsw-m", type=int)
+    parser.add_argument("--hnsw-ef-construct", type=int)
+    parser.add_argument("--hnsw-ef", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
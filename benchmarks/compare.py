@@ -0,0 +1,72 @@
+"""Compare two benchmark reports (from benchmarks.load or benchmarks.micro) entry by entry.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+Prints the relative change of p50/p95/p99 latency and throughput for every
+entry present in both reports. Exits with status 1 when any latency grew, or
+throughput dropped, by more than --threshold percent.
+"""
+import argparse
+import json
+import sys
+from typing import Optional, Tuple
+
+LATENCY_KEYS = ("p50", "p95", "p99")
+THROUGHPUT_KEYS = ("rps", "ops_per_second")
+
+
+def load_results(path: str) -> Tuple[dict, dict]:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    return report, {result["name"]: result for result in report["results"]}
+
+
+def change(baseline: Optional[float], candidate: Optional[float]) -> Optional[float]:
+    if baseline is None or candidate is None or baseline == 0:
+        return None
+    return (candidate - baseline) / baseline * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark JSON reports")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    baseline_report, baseline = load_results(args.baseline)
+    candidate_report, candidate = load_results(args.candidate)
+    print(f"baseline  {baseline_report['metadata'].get('commit')}")
+    print(f"candidate {candidate_report['metadata'].get('commit')}")
+
+    regressions = []
+    for name in baseline:
+        if name not in candidate:
+            print(f"{name}: missing from candidate")
+            continue
+        parts = []
+        for key in LATENCY_KEYS:
+            delta = change(baseline[name]["latency_ms"][key], candidate[name]["latency_ms"][key])
+            if delta is None:
+                continue
+            parts.append(f"{key} {delta:+.1f}%")
+            if delta > args.threshold:
+                regressions.append(f"{name} {key}")
+        for key in THROUGHPUT_KEYS:
+            if key not in baseline[name]:
+                continue
+            delta = change(baseline[name][key], candidate[name].get(key))
+            if delta is None:
+                continue
+            parts.append(f"{key} {delta:+.1f}%")
+            if delta < -args.threshold:
+                regressions.append(f"{name} {key}")
+        print(f"{name}: {', '.join(parts)}")
+
+    if regressions:
+        print(f"Regressions above {args.threshold:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""OpenAI-compatible stand-in for /v1/chat/completions with configurable latency.
+
+    python -m benchmarks.fake_openai --port 8766 --latency-ms 800 --jitter-ms 200
+
+Point the service at it with OPENAI_BASE_URL=http://127.0.0.1:8766/v1. The
+reply echoes the first USER line of the dialog as the question and the first
+SUPPORT line as the answer, so every ticket gets a distinct Q&A pair. A share
+of dialogs can be answered with a null question (--no-qa-ratio) or a 500
+(--error-ratio). Streaming requests are answered as server-sent events.
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+settings = {"latency_ms": 800.0, "jitter_ms": 200.0, "no_qa_ratio": 0.3, "error_ratio": 0.0, "chunk_chars": 16}
+
+RATE_LIMIT_HEADERS = {
+    "x-ratelimit-limit-requests": "10000",
+    "x-ratelimit-remaining-requests": "9999",
+    "x-ratelimit-limit-tokens": "10000000",
+    "x-ratelimit-remaining-tokens": "9999000",
+}
+
+_USER_RE = re.compile(r"^USER: (.+)$", re.MULTILINE)
+_SUPPORT_RE = re.compile(r"^SUPPORT: (.+)$", re.MULTILINE)
+
+app = FastAPI(title="fake-openai")
+
+
+def build_reply(prompt: str) -> dict:
+    # The service's prompts put the dialog after this marker and examples after the dialog
+    dialog = prompt.split("INPUT DIALOG:", 1)[-1]
+    question = _USER_RE.search(dialog)
+    answer = _SUPPORT_RE.search(dialog)
+    if question is None or answer is None or random.random() < settings["no_qa_ratio"]:
+        return {
+            "question": None, "confidence": 0.0, "original_text": None, "position": None,
+            "answer": None, "relevance": 0.0, "answer_original_text": None, "support_message_id": None,
+        }
+    # Superset of the combined, question-only and answer-only reply formats
+    return {
+        "question": question.group(1).strip(),
+        "confidence": 0.95,
+        "original_text": question.group(1).strip(),
+        "position": 1,
+        "answer": answer.group(1).strip(),
+        "relevance": 0.9,
+        "answer_original_text": answer.group(1).strip(),
+        "support_message_id": 2,
+    }
+
+
+def usage(prompt: str, content: str) -> dict:
+    prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+
+
+async def simulated_latency():
+    delay = max(0.0, random.gauss(settings["latency_ms"], settings["jitter_ms"])) / 1000
+    await asyncio.sleep(delay)
+
+
+@app.get("/v1/models")
+async def list_models():
+    return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model", "owned_by": "benchmark"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    prompt = body["messages"][-1]["content"]
+    if random.random() < settings["error_ratio"]:
+        await simulated_latency()
+        return JSONResponse({"error": {"message": "simulated failure", "type": "server_error"}}, status_code=500)
+
+    content = json.dumps(build_reply(prompt), ensure_ascii=False)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    created = int(time.time())
+    model = body.get("model", "gpt-4o-mini")
+
+    if body.get("stream"):
+        async def events():
+            # Time to first token, then the body in small chunks
+            await simulated_latency()
+            step = settings["chunk_chars"]
+            for start in range(0, len(content), step):
+                chunk = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [{"index": 0, "delta": {"content": content[start:start + step]}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                await asyncio.sleep(0.002)
+            final = {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [], "usage": usage(prompt, content),
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=RATE_LIMIT_HEADERS)
+
+    await simulated_latency()
+    return JSONResponse({
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": created,
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": usage(prompt, content),
+    }, headers=RATE_LIMIT_HEADERS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=settings["latency_ms"], help="Mean completion latency")
+    parser.add_argument("--jitter-ms", type=float, default=settings["jitter_ms"], help="Standard deviation of the latency")
+    parser.add_argument("--no-qa-ratio", type=float, default=settings["no_qa_ratio"], help="Share of dialogs answered with a null question")
+    parser.add_argument("--error-ratio", type=float, default=settings["error_ratio"], help="Share of requests answered with HTTP 500")
+    args = parser.parse_args()
+
+    settings.update(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        no_qa_ratio=args.no_qa_ratio,
+        error_ratio=args.error_ratio,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
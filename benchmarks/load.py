@@ -0,0 +1,277 @@
+"""Load test of /qa/search and /qa/save against local stand-ins.
+
+Starts the fake OpenAI server (benchmarks.fake_openai) and the app under
+uvicorn with in-memory Qdrant and a throwaway SQLite file, seeds a corpus,
+then drives each endpoint at every concurrency level:
+
+    python -m benchmarks.load --concurrency 1 4 16 --requests 400 --output load.json
+    python -m benchmarks.load --workers 4 --qdrant-url http://localhost:6333 \\
+        --database-url postgresql://qa:qa@localhost/qa_bench --output load.json
+
+In-memory Qdrant lives inside one worker process, so more than one worker
+needs a Qdrant server. Memory per worker is read from /proc (Linux only).
+Compare two reports with ``python -m benchmarks.compare``.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.common import run_metadata, summarize_latencies, write_report
+
+
+WORKSPACE = "bench"
+WORKSPACE_TOKEN = "bench-token"
+ADMIN_TOKEN = "bench-admin-token"
+
+TOPICS = [
+    ("reset my password", "Go to Settings > Security and click Reset password, the link arrives by email."),
+    ("export invoices to CSV", "Open Billing, select the period and click Export, CSV is the default format."),
+    ("connect the printer over wifi", "Install the latest driver, then select the printer under Devices > Add."),
+    ("change the delivery address", "Open the order, click Edit address and enter the new one before dispatch."),
+    ("enable two factor authentication", "Go to Settings > Security, click Enable 2FA and scan the QR code."),
+    ("restore a deleted project", "Open Trash, select the project and click Restore within 30 days."),
+    ("update the billing card", "Go to Billing > Payment methods, click Add card and set it as default."),
+    ("fix the sync error 504", "Clear the local cache under Settings > Storage and restart the app."),
+]
+
+
+def make_dialog(ticket_id: int) -> dict:
+    topic, answer = TOPICS[ticket_id % len(TOPICS)]
+    return {
+        "ticket_id": ticket_id,
+        "question": f"How do I {topic}?",
+        "dialog": [
+            {"role": "user", "content": f"Hi, how do I {topic}? Ticket {ticket_id}"},
+            {"role": "support", "content": answer},
+            {"role": "user", "content": "Thanks, that worked"},
+        ],
+    }
+
+
+def search_body(rng: random.Random) -> dict:
+    topic, _ = rng.choice(TOPICS)
+    # A varying suffix keeps most queries out of the search result cache
+    return {"question": f"how can I {topic} {rng.randint(0, 10 ** 6)}", "top_k": 5}
+
+
+def process_memory(pid: int) -> Optional[Dict[str, float]]:
+    """Resident and peak resident set size in MiB"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+
+    def mib(name: str) -> Optional[float]:
+        value = fields.get(name)
+        return int(value.split()[0]) / 1024 if value else None
+
+    return {"rss_mib": mib("VmRSS"), "peak_rss_mib": mib("VmHWM")}
+
+
+def child_pids(pid: int) -> List[int]:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", encoding="utf-8") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+
+
+def worker_memory(server_pid: int) -> List[dict]:
+    # uvicorn --workers N forks N children; a single worker runs in the server process itself
+    pids = child_pids(server_pid) or [server_pid]
+    return [{"pid": pid, **(process_memory(pid) or {})} for pid in pids]
+
+
+def start_process(args: List[str], env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], env={**os.environ, **env})
+
+
+def stop_process(process: subprocess.Popen):
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str, process: subprocess.Popen, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{url} exited with code {process.returncode}")
+        try:
+            if (await client.get(url)).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(0.5)
+    raise TimeoutError(f"{url} was not ready within {timeout:.0f}s")
+
+
+async def seed(client: httpx.AsyncClient, count: int, batch_size: int = 100):
+    started = time.perf_counter()
+    for start in range(0, count, batch_size):
+        items = [make_dialog(ticket_id) for ticket_id in range(start, min(start + batch_size, count))]
+        response = await client.post("/qa/save/batch", json={"items": items})
+        response.raise_for_status()
+    print(f"Seeded {count} tickets in {time.perf_counter() - started:.1f}s")
+
+
+async def run_level(client: httpx.AsyncClient, endpoint: str, concurrency: int, total: int, ticket_ids, rng: random.Random) -> dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    remaining = itertools.count()
+
+    async def worker():
+        while next(remaining) < total:
+            if endpoint == "search":
+                path, body = "/qa/search", search_body(rng)
+            else:
+                path, body = "/qa/save", make_dialog(next(ticket_ids))
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                outcome = str(response.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[outcome] = statuses.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    ok = sum(count for outcome, count in statuses.items() if outcome.startswith("2"))
+    return {
+        "name": f"{endpoint}@c{concurrency}",
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(latencies) - ok,
+        "statuses": statuses,
+        "elapsed_seconds": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": summarize_latencies(latencies),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    workdir = tempfile.mkdtemp(prefix="qna-bench-")
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    app_url = f"http://127.0.0.1:{args.app_port}"
+    env = {
+        "OPENAI_API_KEY": "fake",
+        "OPENAI_BASE_URL": f"{fake_url}/v1",
+        "API_TOKEN": ADMIN_TOKEN,
+        "WORKSPACE_TOKENS": f"{WORKSPACE}:{WORKSPACE_TOKEN}",
+        "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "QDRANT_URL": args.qdrant_url,
+        "INGESTION_MODE": "sync",
+        "TRACING_EXPORTER": "none",
+    }
+    env.update(dict(item.split("=", 1) for item in args.env))
+
+    fake = start_process([
+        "-m", "benchmarks.fake_openai", "--port", str(args.fake_port),
+        "--latency-ms", str(args.llm_latency_ms), "--jitter-ms", str(args.llm_jitter_ms),
+        "--no-qa-ratio", str(args.no_qa_ratio),
+    ], {})
+    server = start_process([
+        "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(args.app_port),
+        "--workers", str(args.workers), "--log-level", "warning",
+    ], env)
+
+    results = []
+    try:
+        async with httpx.AsyncClient(timeout=30.0) as probe:
+            await wait_ready(probe, f"{fake_url}/v1/models", fake, args.startup_timeout)
+            await wait_ready(probe, f"{app_url}/ready", server, args.startup_timeout)
+
+        limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+        headers = {"Authorization": f"Bearer {WORKSPACE_TOKEN}"}
+        async with httpx.AsyncClient(base_url=app_url, headers=headers, limits=limits, timeout=args.request_timeout) as client:
+            if args.seed_tickets:
+                await seed(client, args.seed_tickets)
+            memory_after_seed = worker_memory(server.pid)
+
+            rng = random.Random(args.seed)
+            # Saves always use fresh ticket ids so every request runs the full pipeline
+            ticket_ids = itertools.count(args.seed_tickets + 1)
+            for endpoint in args.endpoints:
+                for concurrency in args.concurrency:
+                    result = await run_level(client, endpoint, concurrency, args.requests, ticket_ids, rng)
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    print(
+                        f"{result['name']:>12}: {result['rps']:.1f} req/s "
+                        f"p50={latency['p50']:.1f}ms p95={latency['p95']:.1f}ms p99={latency['p99']:.1f}ms "
+                        f"errors={result['errors']}"
+                    )
+            memory_after_load = worker_memory(server.pid)
+    finally:
+        stop_process(server)
+        stop_process(fake)
+
+    return {
+        "benchmark": "load",
+        "metadata": run_metadata(),
+        "settings": {
+            "workers": args.workers,
+            "requests_per_level": args.requests,
+            "seed_tickets": args.seed_tickets,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+            "no_qa_ratio": args.no_qa_ratio,
+            "database": "sqlite" if args.database_url is None else args.database_url.split(":", 1)[0],
+            "qdrant_url": args.qdrant_url,
+            "env": args.env,
+        },
+        "memory": {"after_seed": memory_after_seed, "after_load": memory_after_load},
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test /qa/search and /qa/save against local stand-ins")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and concurrency level")
+    parser.add_argument("--endpoints", nargs="+", choices=["search", "save"], default=["search", "save"])
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed-tickets", type=int, default=1000, help="Tickets saved before measuring")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="Mean fake completion latency")
+    parser.add_argument("--llm-jitter-ms", type=float, default=200.0)
+    parser.add_argument("--no-qa-ratio", type=float, default=0.3, help="Share of dialogs without a Q&A pair")
+    parser.add_argument("--database-url", help="Database URL (default: SQLite file in a temporary directory)")
+    parser.add_argument("--qdrant-url", default=":memory:", help="Qdrant URL or :memory: for an in-process store")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra app setting (repeatable)")
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--fake-port", type=int, default=8766)
+    parser.add_argument("--startup-timeout", type=float, default=300.0, help="Includes embedding model loading")
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.qdrant_url == ":memory:" and args.workers > 1:
+        parser.error("in-memory Qdrant is per process; use a Qdrant server with --workers > 1")
+    if any("=" not in item for item in args.env):
+        parser.error("--env takes KEY=VALUE")
+
+    report = asyncio.run(run(args))
+    if args.output:
+        write_report(args.output, report)
+
+
+if __name__ == "__main__":
+    main()
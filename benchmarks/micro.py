@@ -0,0 +1,176 @@
+"""Micro-benchmarks of the hot functions, without HTTP or external services.
+
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.micro --only search json
+
+Covers Embedder.encode at several batch sizes, QdrantHelper.search_similar on
+in-memory Qdrant and FlatVectorIndex.search_similar over the same synthetic
+vectors, and BaseAIClient._extract_first_json_object over typical model
+replies. Every entry reports per-call latency percentiles and calls per second.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from app.core.config import get_config
+from benchmarks.collection_profiles import synthetic_vectors
+from benchmarks.common import run_metadata, summarize_latencies, write_report
+
+
+QA_REPLY = {
+    "question": "How do I reset my password?",
+    "confidence": 0.93,
+    "original_text": "hi, how do I reset my password? the link does not arrive",
+    "position": 1,
+    "answer": "Go to Settings > Security and click Reset password.",
+    "relevance": 0.88,
+    "answer_original_text": "Go to Settings > Security and click Reset password, the link arrives by email.",
+    "support_message_id": 2,
+}
+
+# Shapes seen from models: plain JSON, fenced, wrapped in prose, nested objects
+JSON_SAMPLES = {
+    "clean": json.dumps(QA_REPLY),
+    "fenced": "```json\n" + json.dumps(QA_REPLY, indent=2) + "\n```",
+    "prose": "Sure! Here is the extracted pair:\n" + json.dumps(QA_REPLY) + "\nLet me know if you need anything else.",
+    "nested": "Result: " + json.dumps({**QA_REPLY, "meta": {"language": "en", "tags": ["auth", "email"]}}) + " done",
+}
+
+
+def entry(name: str, latencies: List[float], items_per_call: int = 1) -> dict:
+    total = sum(latencies)
+    return {
+        "name": name,
+        "calls": len(latencies),
+        "latency_ms": summarize_latencies(latencies),
+        "ops_per_second": len(latencies) * items_per_call / total if total else 0.0,
+    }
+
+
+def time_calls(call: Callable[[], object], iterations: int, warmup: int) -> List[float]:
+    for _ in range(warmup):
+        call()
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def bench_encode(args: argparse.Namespace) -> List[dict]:
+    from app.services.embeddings import Embedder
+
+    config = get_config()
+    embedder = Embedder(
+        model_name=config.embedding_model_name,
+        backend=config.embedding_backend,
+        onnx_file_name=config.embedding_onnx_file_name
+    )
+    embedder.load()
+    results = []
+    for batch_size in args.batch_sizes:
+        texts = [f"How do I reset the password for account number {index}?" for index in range(batch_size)]
+        latencies = time_calls(lambda: embedder.encode(texts), args.iterations, args.warmup)
+        # ops are texts embedded per second
+        results.append(entry(f"embedder.encode[{embedder.backend},batch={batch_size}]", latencies, batch_size))
+    return results
+
+
+async def bench_search(args: argparse.Namespace) -> List[dict]:
+    from app.services.qdrant import QdrantHelper, create_qdrant_client
+
+    client = create_qdrant_client(":memory:")
+    helper = QdrantHelper(url="", collection_name="bench_micro", client=client)
+    try:
+        vectors = synthetic_vectors(args.vectors, args.seed)
+        await helper.add_vectors(vectors, [{"ticket_id": index} for index in range(len(vectors))], batch_size=1024)
+        queries = vectors[np.random.default_rng(args.seed + 1).integers(0, len(vectors), args.iterations + args.warmup)]
+
+        for query in queries[:args.warmup]:
+            await helper.search_similar(query, top_k=args.top_k)
+        latencies = []
+        for query in queries[args.warmup:]:
+            started = time.perf_counter()
+            await helper.search_similar(query, top_k=args.top_k)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        await client.close()
+    return [entry(f"qdrant.search_similar[memory,n={args.vectors},k={args.top_k}]", latencies)]
+
+
+async def bench_flat(args: argparse.Namespace) -> List[dict]:
+    from app.services.flat_index import FlatVectorIndex
+
+    with tempfile.TemporaryDirectory() as path:
+        index = FlatVectorIndex(path, collection_name="bench_micro")
+        try:
+            vectors = synthetic_vectors(args.vectors, args.seed)
+            await index.add_vectors(vectors, [{"ticket_id": row} for row in range(len(vectors))])
+            queries = vectors[np.random.default_rng(args.seed + 1).integers(0, len(vectors), args.iterations + args.warmup)]
+
+            for query in queries[:args.warmup]:
+                await index.search_similar(query, top_k=args.top_k)
+            latencies = []
+            for query in queries[args.warmup:]:
+                started = time.perf_counter()
+                await index.search_similar(query, top_k=args.top_k)
+                latencies.append(time.perf_counter() - started)
+        finally:
+            index.close()
+    return [entry(f"flat_index.search_similar[n={args.vectors},k={args.top_k}]", latencies)]
+
+
+def bench_json(args: argparse.Namespace) -> List[dict]:
+    from app.services.llm_client import BaseAIClient
+
+    client = BaseAIClient()
+    results = []
+    for shape, text in JSON_SAMPLES.items():
+        if client._extract_first_json_object(text) is None:
+            raise RuntimeError(f"_extract_first_json_object found nothing in the {shape} sample")
+        latencies = time_calls(lambda: client._extract_first_json_object(text), args.iterations * 10, args.warmup)
+        results.append(entry(f"extract_first_json_object[{shape}]", latencies))
+    return results
+
+
+BENCHMARKS = ("encode", "search", "flat", "json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of embedding, vector search and JSON extraction")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per entry (x10 for JSON extraction)")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32], help="Embedder batch sizes")
+    parser.add_argument("--vectors", type=int, default=10000, help="Synthetic vectors in the search collection")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    results = []
+    if "encode" in args.only:
+        results += bench_encode(args)
+    if "search" in args.only:
+        results += asyncio.run(bench_search(args))
+    if "flat" in args.only:
+        results += asyncio.run(bench_flat(args))
+    if "json" in args.only:
+        results += bench_json(args)
+
+    for result in results:
+        latency = result["latency_ms"]
+        print(f"{result['name']:>56}: p50={latency['p50']:.3f}ms p99={latency['p99']:.3f}ms {result['ops_per_second']:.1f} ops/s")
+
+    if args.output:
+        write_report(args.output, {"benchmark": "micro", "metadata": run_metadata(), "results": results})
+
+
+if __name__ == "__main__":
+    main()
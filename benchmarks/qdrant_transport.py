@@ -0,0 +1,123 @@
+"""Search and upsert latency and client CPU time over the REST and gRPC transports.
+
+Needs a running Qdrant server with both ports open (6333 REST, 6334 gRPC).
+
+    python -m benchmarks.qdrant_transport --synthetic 20000 --concurrency 1 16 --output transport.json
+
+CPU time is this process's (time.process_time), so it covers request encoding,
+response decoding and the event loop but not the server. Compare two reports
+with ``python -m benchmarks.compare``.
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List
+
+import numpy as np
+
+from app.services.qdrant import QDRANT_TRANSPORTS, QdrantHelper, create_qdrant_client
+from benchmarks.collection_profiles import synthetic_vectors
+from benchmarks.common import run_metadata, summarize_latencies, write_report
+
+
+def entry(name: str, latencies: List[float], elapsed: float, cpu_seconds: float, items: int) -> dict:
+    return {
+        "name": name,
+        "calls": len(latencies),
+        "latency_ms": summarize_latencies(latencies),
+        "ops_per_second": items / elapsed if elapsed else 0.0,
+        "cpu_ms_per_op": cpu_seconds * 1000 / items if items else None,
+    }
+
+
+async def timed_searches(helper: QdrantHelper, queries: np.ndarray, concurrency: int, top_k: int) -> tuple:
+    latencies: List[float] = []
+    pending = iter(queries)
+
+    async def worker():
+        for query in pending:
+            started = time.perf_counter()
+            await helper.search_similar(query, top_k=top_k)
+            latencies.append(time.perf_counter() - started)
+
+    started, cpu_started = time.perf_counter(), time.process_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started, time.process_time() - cpu_started
+
+
+async def benchmark_transport(args: argparse.Namespace, transport: str, vectors: np.ndarray, queries: np.ndarray) -> List[dict]:
+    client = create_qdrant_client(
+        args.url, transport=transport, timeout=args.timeout, pool_size=args.pool_size, grpc_port=args.grpc_port
+    )
+    collection_name = f"bench_transport_{transport}"
+    helper = QdrantHelper(url="", collection_name=collection_name, client=client)
+    results = []
+    try:
+        if await client.collection_exists(collection_name):
+            await client.delete_collection(collection_name)
+        payloads = [{"ticket_id": index, "question": f"question {index}", "answer": f"answer {index}"} for index in range(len(vectors))]
+
+        latencies = []
+        started, cpu_started = time.perf_counter(), time.process_time()
+        for start in range(0, len(vectors), args.batch_size):
+            end = start + args.batch_size
+            batch_started = time.perf_counter()
+            await helper.add_vectors(vectors[start:end], payloads[start:end], batch_size=args.batch_size)
+            latencies.append(time.perf_counter() - batch_started)
+        elapsed, cpu_seconds = time.perf_counter() - started, time.process_time() - cpu_started
+        # ops are points upserted
+        results.append(entry(f"upsert[{transport},batch={args.batch_size}]", latencies, elapsed, cpu_seconds, len(vectors)))
+
+        await timed_searches(helper, queries[:args.warmup], 1, args.top_k)
+        for concurrency in args.concurrency:
+            latencies, elapsed, cpu_seconds = await timed_searches(helper, queries[args.warmup:], concurrency, args.top_k)
+            results.append(entry(f"search[{transport},c{concurrency}]", latencies, elapsed, cpu_seconds, len(latencies)))
+    finally:
+        await client.delete_collection(collection_name)
+        await client.close()
+
+    for result in results:
+        latency = result["latency_ms"]
+        print(
+            f"{result['name']:>28}: p50={latency['p50']:.2f}ms p99={latency['p99']:.2f}ms "
+            f"{result['ops_per_second']:.0f} ops/s cpu={result['cpu_ms_per_op']:.3f}ms/op"
+        )
+    return results
+
+
+async def run(args: argparse.Namespace) -> List[dict]:
+    vectors = synthetic_vectors(args.synthetic, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    queries = vectors[rng.integers(0, len(vectors), args.queries + args.warmup)]
+    results = []
+    for transport in args.transport:
+        results += await benchmark_transport(args, transport, vectors, queries)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Qdrant REST and gRPC transports")
+    parser.add_argument("--url", default=os.getenv("QDRANT_URL", "http://localhost:6333"), help="Qdrant server URL")
+    parser.add_argument("--grpc-port", type=int, default=int(os.getenv("QDRANT_GRPC_PORT", "6334")))
+    parser.add_argument("--transport", nargs="+", choices=QDRANT_TRANSPORTS, default=list(QDRANT_TRANSPORTS))
+    parser.add_argument("--timeout", type=int, help="Client request timeout in seconds")
+    parser.add_argument("--pool-size", type=int, help="REST connection pool size")
+    parser.add_argument("--synthetic", type=int, default=20000, help="Number of synthetic vectors")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per upsert request")
+    parser.add_argument("--queries", type=int, default=2000, help="Timed searches per concurrency level")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        settings = {key: value for key, value in vars(args).items() if key != "output"}
+        write_report(args.output, {"benchmark": "qdrant_transport", "metadata": run_metadata(), "settings": settings, "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import json
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import httpx
+import openai
+
+from app.core.exceptions import LLMException
+from app.services.llm_client import OpenAIClient
+
+
+def completion(payload: dict):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(payload)))],
+        usage=SimpleNamespace(total_tokens=10)
+    )
+
+
+def server_error():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return openai.InternalServerError("server error", response=httpx.Response(500, request=request), body=None)
+
+
+class ExtractQAPairWithStatusTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = OpenAIClient(api_key="test", extraction_mode="single")
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_provider_error_on_single_call_propagates_without_fallback(self):
+        self.client._create_completion = AsyncMock(side_effect=[server_error()])
+
+        with self.assertRaises(LLMException):
+            await self.client.extract_qa_pair_with_status("user: hi\nsupport: hello")
+        self.assertEqual(self.client._create_completion.await_count, 1)
+
+    async def test_unusable_single_reply_recovered_by_two_step_is_not_an_api_failure(self):
+        self.client._create_completion = AsyncMock(side_effect=[
+            SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="no json here"))]),
+            completion({"question": None, "confidence": 0.0, "original_text": None, "position": None}),
+        ])
+
+        result, api_failed = await self.client.extract_qa_pair_with_status("user: hi\nsupport: hello")
+
+        self.assertIsNone(result)
+        self.assertFalse(api_failed)
+        self.assertEqual(self.client._create_completion.await_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()